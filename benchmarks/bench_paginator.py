@@ -0,0 +1,66 @@
+"""Рендер навигации по страницам: все номера против окна.
+
+    python benchmarks/bench_paginator.py [--repeat 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(BENCH_DIR, '..', 'yatube'), BENCH_DIR]
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bench_settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.template import Context, Template, engines  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+
+from posts.constants import NUM_PAGE  # noqa: E402
+from posts.utils import paginator  # noqa: E402
+
+# прежний вариант навигации: по ссылке на каждую страницу
+FULL_RANGE = Template(
+    '{% for i in page_obj.paginator.page_range %}'
+    '{% if page_obj.number == i %}<li class="page-item active">'
+    '<span class="page-link">{{ i }}</span></li>'
+    '{% else %}<li class="page-item"><a class="page-link" '
+    'href="?{{ page_query }}page={{ i }}">{{ i }}</a></li>'
+    '{% endif %}{% endfor %}'
+)
+
+
+def timed(render, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        html = render()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    return statistics.median(samples), len(html.encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    windowed = engines['django'].get_template('posts/includes/paginator.html')
+    for pages in (10 ** 3, 10 ** 4, 10 ** 5):
+        request = RequestFactory().get('/', {'page': pages // 2})
+        page_obj = paginator(request, range(pages * NUM_PAGE), cursor=False)
+        context = {'page_obj': page_obj}
+        for name, render in (
+            ('full', lambda: FULL_RANGE.render(Context(context))),
+            ('window', lambda: windowed.render(context)),
+        ):
+            median, size = timed(render, args.repeat)
+            print(f'pages={pages:<7} {name:6} median={median:9.3f}ms '
+                  f'bytes={size}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+"""Настройки бенчмарков: production-профиль на отдельной базе,
+статика без collectstatic.
+
+Путь к базе можно задать через YATUBE_BENCH_DB.
+"""
+import os
+
+from yatube.settings_production import *  # noqa: F401,F403
+from yatube.settings_production import DATABASES
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'NAME': os.environ.get('YATUBE_BENCH_DB', os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), 'bench.sqlite3')),
+    },
+}
+
+ALLOWED_HOSTS = ['testserver']
+# все чтения с одной базы, чтобы замеры были сопоставимы
+DATABASE_REPLICAS = []
+
+STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+SERVE_STATIC = False
@@ -0,0 +1,137 @@
+"""Чтения ленты одновременно с публикацией постов на SQLite.
+
+Сравнивает PRAGMA по умолчанию (журнал DELETE) без постоянных соединений
+и настроенные SQLITE_PRAGMAS и CONN_MAX_AGE из yatube.settings_production:
+читатели открывают случайные страницы главной, писатели публикуют посты
+через post_create.
+База - та же, что у run.py (сначала python benchmarks/run.py seed).
+
+    python benchmarks/bench_sqlite_concurrency.py --readers 8 --writers 2
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(BENCH_DIR, '..', 'yatube'), BENCH_DIR]
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bench_settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+from posts.models import Post  # noqa: E402
+
+# (PRAGMA, CONN_MAX_AGE)
+PROFILES = {
+    'default': ({'journal_mode': 'DELETE'}, 0),
+    'tuned': (settings.SQLITE_PRAGMAS, settings.CONN_MAX_AGE),
+}
+
+
+def reader(deadline, latencies, errors):
+    client = Client()
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = client.get('/', {'page': random.randint(1, 50)})
+            ok = response.status_code == 200
+        except Exception:
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(1)
+    connections.close_all()
+
+
+def writer(author, deadline, latencies, errors):
+    client = Client()
+    client.force_login(author)
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = client.post('/create/', {'text': 'Нагрузочный пост'})
+            ok = response.status_code == 302
+        except Exception:
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(1)
+    connections.close_all()
+
+
+def run_profile(pragmas, conn_max_age, args, author):
+    connections.close_all()
+    connections.databases['default']['CONN_MAX_AGE'] = conn_max_age
+    results = {'read': ([], []), 'write': ([], [])}
+    with override_settings(SQLITE_PRAGMAS=pragmas):
+        # journal_mode хранится в файле базы: меняем его до старта потоков
+        connections['default'].ensure_connection()
+        deadline = time.perf_counter() + args.duration
+        threads = [
+            threading.Thread(target=reader, args=(deadline, *results['read']))
+            for _ in range(args.readers)
+        ] + [
+            threading.Thread(
+                target=writer, args=(author, deadline, *results['write']))
+            for _ in range(args.writers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        connections.close_all()
+
+    return results
+
+
+def p99(values):
+    values = sorted(values)
+
+    return values[min(len(values) - 1, int(len(values) * 0.99))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+    # медленные запросы под нагрузкой ожидаемы, лог их не нужен
+    logging.getLogger('yatube.queries').setLevel(logging.ERROR)
+
+    post = Post.objects.select_related('author').first()
+    if post is None:
+        sys.exit('База пуста: сначала выполните python benchmarks/run.py seed')
+    print(f'{"profile":8} {"kind":5} {"ops/s":>8} {"p50 ms":>8} '
+          f'{"p99 ms":>8} {"errors":>7}')
+    for name, (pragmas, conn_max_age) in PROFILES.items():
+        results = run_profile(pragmas, conn_max_age, args, post.author)
+        for kind, (latencies, errors) in results.items():
+            if not latencies:
+                print(f'{name:8} {kind:5} {0:8.1f} {"-":>8} {"-":>8} '
+                      f'{len(errors):7d}')
+                continue
+            print(
+                f'{name:8} {kind:5} {len(latencies) / args.duration:8.1f} '
+                f'{statistics.median(latencies) * 1000:8.1f} '
+                f'{p99(latencies) * 1000:8.1f} {len(errors):7d}'
+            )
+    # посты бенчмарка не должны искажать следующие замеры
+    Post.objects.filter(text='Нагрузочный пост').delete()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Холодный и прогретый рендер posts/index.html.
+
+Холодный рендер - первый запрос процесса: разбор шаблона и всех
+его include плюс рендер. Прогретый - рендер из кэширующего загрузчика.
+
+    python benchmarks/bench_templates.py [--repeat 200] [--posts 10]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(BENCH_DIR, '..', 'yatube'), BENCH_DIR]
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bench_settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.core.paginator import Paginator  # noqa: E402
+from django.template import engines  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from posts.models import Post, User  # noqa: E402
+
+TEMPLATE = 'posts/index.html'
+
+
+def fake_context(posts):
+    """Контекст главной без обращений к БД."""
+    author = User(id=1, username='bench')
+    now = timezone.now()
+    page_obj = Paginator([
+        Post(id=i, text=f'Пост {i} ' * 20, author=author,
+             pub_date=now, updated_at=now)
+        for i in range(posts)
+    ], posts).page(1)
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+
+    return {'page_obj': page_obj}, request
+
+
+def timed(render, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--posts', type=int, default=10)
+    args = parser.parse_args()
+
+    engine = engines['django']
+    loaders = engine.engine.template_loaders
+    context, request = fake_context(args.posts)
+
+    def render():
+        engine.get_template(TEMPLATE).render(context, request)
+
+    def cold():
+        for loader in loaders:
+            if hasattr(loader, 'reset'):
+                loader.reset()
+        render()
+
+    # карточки постов рендерятся целиком, без кэша фрагментов
+    dummy = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+    with override_settings(CACHES={'default': dummy, 'post_cards': dummy}):
+        render()
+        for name, bench in (('cold', cold), ('warm', render)):
+            median, worst = timed(bench, args.repeat)
+            print(f'{name:5} median={median:.3f}ms max={worst:.3f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""Нагрузочный тест: пропускная способность и p99 нескольких серверов.
+
+Серверы запускаются отдельно, например:
+
+    gunicorn -w 1 --threads 8 -b 127.0.0.1:8000 yatube.wsgi
+    uvicorn --workers 1 --port 8001 yatube.asgi:application
+
+и сравниваются на одних и тех же путях:
+
+    python benchmarks/loadtest.py --target wsgi=http://127.0.0.1:8000 \\
+        --target asgi=http://127.0.0.1:8001 --path / --path /group/cats/ \\
+        --concurrency 50 --slow-clients 200 --duration 10
+
+slow-clients держат открытыми соединения, которые медленно шлют
+заголовки: так видно, сколько соединений сервер выдерживает,
+не переставая отвечать остальным клиентам.
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def fetch(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: {host}\r\n'
+            f'Connection: close\r\n\r\n'.encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+    finally:
+        writer.close()
+
+    return status_line.split(b' ', 2)[1:2] == [b'200']
+
+
+async def client(host, port, paths, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            ok = await fetch(host, port, next(paths))
+        except OSError:
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(1)
+
+
+async def slow_client(host, port, deadline):
+    """Соединение, которое до конца теста шлёт заголовки по байту."""
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        return
+    try:
+        writer.write(f'GET / HTTP/1.1\r\nHost: {host}\r\n'.encode())
+        while time.perf_counter() < deadline:
+            writer.write(b'X')
+            await writer.drain()
+            await asyncio.sleep(1)
+    except OSError:
+        pass
+    finally:
+        writer.close()
+
+
+async def run_target(url, paths, args):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    deadline = time.perf_counter() + args.duration
+    paths = itertools.cycle(paths)
+    latencies, errors = [], []
+    tasks = [
+        slow_client(host, port, deadline) for _ in range(args.slow_clients)
+    ] + [
+        client(host, port, paths, deadline, latencies, errors)
+        for _ in range(args.concurrency)
+    ]
+    await asyncio.gather(*tasks)
+
+    return latencies, errors
+
+
+def percentile(values, share):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument(
+        '--target', action='append', required=True,
+        help='имя=URL сервера, можно несколько раз')
+    parser.add_argument('--path', action='append', default=None)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--slow-clients', type=int, default=0)
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+    paths = args.path or ['/']
+
+    print(f'{"target":10} {"requests":>9} {"rps":>8} {"p50 ms":>8} '
+          f'{"p99 ms":>8} {"errors":>7}')
+    for target in args.target:
+        name, _, url = target.partition('=')
+        latencies, errors = asyncio.run(run_target(url, paths, args))
+        print(
+            f'{name:10} {len(latencies):9d} '
+            f'{len(latencies) / args.duration:8.1f} '
+            f'{statistics.median(latencies) * 1000 if latencies else 0:8.1f} '
+            f'{percentile(latencies, 0.99) * 1000:8.1f} {len(errors):7d}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""Бенчмарки всех страниц posts, users и about на заполненной базе.
+
+    python benchmarks/run.py seed --posts 100000 --users 1000
+    python benchmarks/run.py run --rounds 20 --save --label "до правки"
+    python benchmarks/run.py compare --tolerance 0.25
+
+seed заполняет отдельную базу (benchmarks/bench.sqlite3 или YATUBE_BENCH_DB)
+командой seed_posts. run замеряет каждую страницу анонимом, анонимом
+с пустыми кэшами (cold: кэш страниц и карточек очищается перед каждым
+замером, так видны запросы некэшированной отрисовки) и автором
+поста: время в мс (min, median, mean, stddev, max) и число SQL-запросов,
+которое сверяется с бюджетом из budgets.json. --save дописывает итог
+в results.json. compare замеряет заново и завершается с ошибкой, если
+медиана выросла больше чем на tolerance или стало больше запросов,
+чем в сохранённом прогоне (по умолчанию последнем).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from importlib import import_module
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(BENCH_DIR, '..', 'yatube'), BENCH_DIR]
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bench_settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.cache import caches  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from posts.models import Group, Post, User  # noqa: E402
+
+URL_MODULES = ('posts.urls', 'users.urls', 'about.urls')
+BUDGETS_FILE = os.path.join(BENCH_DIR, 'budgets.json')
+RESULTS_FILE = os.path.join(BENCH_DIR, 'results.json')
+# разница медиан меньше этого считается шумом
+NOISE_MS = 1.0
+
+
+def url_cases():
+    """(имя, путь, GET-параметры) для каждого маршрута приложений."""
+    post = Post.objects.select_related('author').order_by('id').first()
+    group = Group.objects.order_by('id').first()
+    if post is None or group is None:
+        sys.exit('База пуста: сначала выполните seed.')
+    values = {
+        'slug': group.slug,
+        'username': post.author.username,
+        'post_id': post.id,
+    }
+    query = {
+        'posts:search': {'q': post.text.split()[0]},
+        'posts:export': {'author': post.author.username},
+    }
+    for module in URL_MODULES:
+        urlconf = import_module(module)
+        for pattern in urlconf.urlpatterns:
+            name = f'{urlconf.app_name}:{pattern.name}'
+            kwargs = {key: values[key] for key in pattern.pattern.converters}
+            yield name, reverse(name, kwargs=kwargs), query.get(name, {})
+
+
+def clear_caches():
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+def measure(client, path, data, rounds, login, cold=False):
+    """Один прогрев и rounds замеров. GET-запрос, а если view
+    принимает только POST - POST. cold - очищать кэши перед замером."""
+    method = client.get
+    if client.get(path, data).status_code == 405:
+        method = client.post
+    timings, queries, status = [], 0, None
+    for _ in range(rounds):
+        login()
+        if cold:
+            clear_caches()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = method(path, data)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = max(queries, len(captured))
+        status = response.status_code
+
+    return {
+        'method': method.__name__.upper(),
+        'status': status,
+        'min_ms': min(timings),
+        'median_ms': statistics.median(timings),
+        'mean_ms': statistics.mean(timings),
+        'stddev_ms': statistics.pstdev(timings),
+        'max_ms': max(timings),
+        'queries': queries,
+    }
+
+
+def run_benchmarks(rounds):
+    author = Post.objects.order_by('id').first().author
+    # автор - staff, чтобы замерить и выгрузку
+    User.objects.filter(pk=author.pk).update(is_staff=True)
+    author.refresh_from_db()
+    results = {}
+    for who in ('anon', 'cold', 'author'):
+        client = Client()
+
+        def login():
+            # logout в списке страниц завершает сессию: входим заново
+            session = client.cookies.get('sessionid')
+            if who == 'author' and not (session and session.value):
+                client.force_login(author)
+
+        for name, path, data in url_cases():
+            login()
+            results[f'{name} [{who}]'] = measure(
+                client, path, data, rounds, login, cold=who == 'cold')
+
+    return results
+
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def report(results, budgets, baseline=None, tolerance=0.25):
+    """Печатает таблицу и возвращает список нарушений."""
+    problems = []
+    print(f'{"url":34} {"st":>3} {"min":>8} {"median":>8} {"mean":>8} '
+          f'{"stddev":>7} {"max":>8} {"queries":>9}')
+    for name, row in results.items():
+        budget = budgets.get(name)
+        print(
+            f'{name:34} {row["status"]:3d} {row["min_ms"]:8.2f} '
+            f'{row["median_ms"]:8.2f} {row["mean_ms"]:8.2f} '
+            f'{row["stddev_ms"]:7.2f} {row["max_ms"]:8.2f} '
+            f'{row["queries"]:4d}/{budget if budget is not None else "-":<4}'
+        )
+        if budget is None:
+            problems.append(f'{name}: нет бюджета запросов в budgets.json')
+        elif row['queries'] > budget:
+            problems.append(
+                f'{name}: {row["queries"]} запросов при бюджете {budget}')
+        base = (baseline or {}).get(name)
+        if base is None:
+            continue
+        if row['queries'] > base['queries']:
+            problems.append(
+                f'{name}: запросов {base["queries"]} -> {row["queries"]}')
+        slower = row['median_ms'] - base['median_ms']
+        if (slower > NOISE_MS
+                and row['median_ms'] > base['median_ms'] * (1 + tolerance)):
+            problems.append(
+                f'{name}: медиана {base["median_ms"]:.2f} -> '
+                f'{row["median_ms"]:.2f} мс')
+
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    seed = commands.add_parser('seed', help='заполнить базу бенчмарков')
+    seed.add_argument('--users', type=int, default=1000)
+    seed.add_argument('--groups', type=int, default=50)
+    seed.add_argument('--posts', type=int, default=100000)
+    seed.add_argument('--seed', type=int, default=1)
+    for command in ('run', 'compare'):
+        sub = commands.add_parser(command)
+        sub.add_argument('--rounds', type=int, default=20)
+        sub.add_argument('--save', action='store_true',
+                         help='дописать итог в results.json')
+        sub.add_argument('--label', default='')
+    compare = commands.choices['compare']
+    compare.add_argument('--tolerance', type=float, default=0.25)
+    compare.add_argument(
+        '--baseline', type=int, default=-1,
+        help='номер сохранённого прогона для сравнения (по умолчанию '
+             'последний)')
+    args = parser.parse_args()
+
+    if args.command == 'seed':
+        call_command('migrate', verbosity=0)
+        call_command(
+            'seed_posts', users=args.users, groups=args.groups,
+            posts=args.posts, seed=args.seed)
+        return
+
+    history = load_json(RESULTS_FILE, [])
+    baseline, tolerance = None, getattr(args, 'tolerance', 0.25)
+    if args.command == 'compare':
+        if not history:
+            sys.exit('Нет сохранённых прогонов: выполните run --save.')
+        baseline = history[args.baseline]['results']
+
+    results = run_benchmarks(args.rounds)
+    problems = report(
+        results, load_json(BUDGETS_FILE, {}), baseline, tolerance)
+    if args.save:
+        history.append({
+            'date': datetime.now(timezone.utc).isoformat(),
+            'commit': git_commit(),
+            'label': args.label,
+            'rounds': args.rounds,
+            'results': results,
+        })
+        with open(RESULTS_FILE, 'w', encoding='utf-8') as file:
+            json.dump(history, file, ensure_ascii=False, indent=2)
+    if problems:
+        print('\n'.join(['', 'Регрессии:', *problems]))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
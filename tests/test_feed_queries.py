@@ -0,0 +1,58 @@
+import pytest
+from django.core.cache import cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+class TestFeedQueries:
+
+    def test_index_num_queries(self, client, few_posts_with_group, django_assert_num_queries):
+        # проверка статистики таблицы + COUNT для паджинатора
+        # + страница постов с автором и группой
+        with django_assert_num_queries(3):
+            response = client.get('/')
+        assert response.status_code == 200
+
+    def test_index_cached_count_num_queries(self, client, few_posts_with_group, django_assert_num_queries):
+        client.get('/')
+        # другая страница кэша ленты, но то же число постов
+        with django_assert_num_queries(1):
+            response = client.get('/?page=1')
+        assert response.status_code == 200
+
+    def test_group_num_queries(self, client, few_posts_with_group, django_assert_num_queries):
+        # группа + COUNT + страница постов
+        with django_assert_num_queries(3):
+            response = client.get(f'/group/{few_posts_with_group.group.slug}/')
+        assert response.status_code == 200
+
+    def test_profile_num_queries(self, client, few_posts_with_group, django_assert_num_queries):
+        # автор со счётчиком постов + COUNT + страница постов
+        with django_assert_num_queries(3):
+            response = client.get(f'/profile/{few_posts_with_group.author.username}/')
+        assert response.status_code == 200
+
+    def test_post_detail_num_queries(self, client, post_with_group, django_assert_num_queries):
+        # проверка свежести + пост с автором, его счётчиком постов и группой
+        with django_assert_num_queries(2):
+            response = client.get(f'/posts/{post_with_group.id}/')
+        assert response.status_code == 200
+
+    def test_post_detail_not_modified_num_queries(self, client, post_with_group, django_assert_num_queries):
+        etag = client.get(f'/posts/{post_with_group.id}/')['ETag']
+        # только проверка свежести
+        with django_assert_num_queries(1):
+            response = client.get(f'/posts/{post_with_group.id}/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_feed_defers_unused_columns(self, client, few_posts_with_group):
+        response = client.get('/')
+        post = response.context['page_obj'].object_list[0]
+        assert 'group_id' not in post.get_deferred_fields()
+        assert 'password' in post.author.get_deferred_fields()
+        assert 'description' in post.group.get_deferred_fields()
@@ -0,0 +1,158 @@
+import asyncio
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+# тело запроса больше этого размера уходит из памяти во временный файл
+BODY_MEMORY_SIZE = 1024 * 1024
+
+
+class ASGIHandler:
+    """ASGI-приложение поверх WSGI-обработчика Django 2.2.
+
+    Соединения держит цикл событий: медленные клиенты, пока шлют запрос
+    и читают ответ, не занимают потоки. Сам Django (view, ORM, шаблоны)
+    работает в ограниченном пуле из max_workers потоков. Потоковые ответы
+    читаются в потоке пула, каждая порция отправляется через цикл событий.
+    """
+
+    def __init__(self, wsgi_application, max_workers):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix='asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f'Неподдерживаемый тип ASGI: {scope["type"]}')
+
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            start, content = await loop.run_in_executor(
+                self.executor, self.handle, scope, body, send, loop)
+        finally:
+            body.close()
+        if start is not None:
+            await send(start)
+            await send({'type': 'http.response.body', 'body': content})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, receive):
+        """Тело запроса целиком; None, если клиент отключился."""
+        body = tempfile.SpooledTemporaryFile(
+            max_size=BODY_MEMORY_SIZE, mode='w+b')
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None
+            body.write(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+        body.seek(0)
+
+        return body
+
+    def handle(self, scope, body, send, loop):
+        """Выполняется в потоке пула. Обычный ответ возвращается
+        в цикл событий целиком; потоковый отправляется отсюда
+        по порциям, и тогда возвращается (None, None)."""
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [
+                (name.lower().encode('latin1'), value.encode('latin1'))
+                for name, value in headers
+            ]
+
+        response = self.wsgi_application(
+            self.environ(scope, body), start_response)
+        start = {
+            'type': 'http.response.start',
+            'status': started['status'],
+            'headers': started['headers'],
+        }
+        try:
+            if not getattr(response, 'streaming', False):
+                return start, b''.join(response)
+            self.send_from_thread(send, start, loop)
+            for chunk in response:
+                self.send_from_thread(send, {
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': True,
+                }, loop)
+            self.send_from_thread(
+                send, {'type': 'http.response.body', 'body': b''}, loop)
+        finally:
+            # request_finished: закрытие соединений с БД этого потока
+            if hasattr(response, 'close'):
+                response.close()
+
+        return None, None
+
+    @staticmethod
+    def send_from_thread(send, message, loop):
+        asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+    @staticmethod
+    def environ(scope, body):
+        server_name, server_port = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            # WSGI передаёт путь байтами, декодированными как latin-1
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin1'),
+            'SERVER_NAME': server_name,
+            'SERVER_PORT': str(server_port),
+            'REMOTE_ADDR': client[0],
+            'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin1').upper().replace('-', '_')
+            value = value.decode('latin1')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = f'HTTP_{name}'
+            if name in environ:
+                # HTTP/2 присылает каждую cookie отдельным заголовком,
+                # а Django разбирает HTTP_COOKIE по "; "
+                separator = '; ' if name == 'HTTP_COOKIE' else ','
+                value = f'{environ[name]}{separator}{value}'
+            environ[name] = value
+
+        return environ
+
+
+def get_asgi_application():
+    from django.core.wsgi import get_wsgi_application
+
+    from .static import static_application
+
+    return ASGIHandler(
+        static_application(get_wsgi_application()), settings.ASGI_THREADS)
@@ -0,0 +1,116 @@
+import gzip
+import threading
+import time
+import zlib
+from collections import defaultdict
+
+from django.conf import settings
+
+from .static import accepted_encodings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/x-ndjson',
+    'application/javascript', 'application/xml', 'image/svg+xml',
+)
+
+# view -> [ответов, байт до сжатия, байт после, секунд CPU]
+compression_stats = defaultdict(lambda: [0, 0, 0, 0.0])
+_stats_lock = threading.Lock()
+
+
+def record(view_name, raw, compressed, cpu):
+    with _stats_lock:
+        stat = compression_stats[view_name]
+        stat[0] += 1
+        stat[1] += raw
+        stat[2] += compressed
+        stat[3] += cpu
+
+
+def stats_rows():
+    """(view, ответов, КиБ до, КиБ после, доля, мс CPU на ответ),
+    сначала view с наибольшим объёмом."""
+    with _stats_lock:
+        items = [(view, *stat) for view, stat in compression_stats.items()]
+    rows = [
+        (view, count, raw / 1024, packed / 1024,
+         packed / raw if raw else 1.0, cpu * 1000 / count)
+        for view, count, raw, packed, cpu in items
+    ]
+
+    return sorted(rows, key=lambda row: row[2], reverse=True)
+
+
+def negotiate(accept_encoding):
+    """Кодировка ответа: brotli, если он установлен и принимается
+    клиентом, иначе gzip; None - без сжатия."""
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+
+    return None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(
+            content, quality=settings.COMPRESS_BROTLI_QUALITY)
+
+    return gzip.compress(
+        content, compresslevel=settings.COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+class StreamCompressor:
+    """Сжатие потока по порциям: порции копятся до
+    COMPRESS_STREAM_BUFFER байт и сжимаются со сбросом вместе, чтобы
+    клиент получал данные без ожидания конца выгрузки, а сброс
+    на каждой мелкой порции (строке выгрузки) не портил сжатие."""
+
+    def __init__(self, encoding):
+        if encoding == 'br':
+            self.compressor = brotli.Compressor(
+                quality=settings.COMPRESS_BROTLI_QUALITY)
+            self.process = self.compressor.process
+            self.flush = self.compressor.flush
+            self.finish = self.compressor.finish
+        else:
+            # wbits 16+ - формат gzip, а не голый deflate
+            self.compressor = zlib.compressobj(
+                settings.COMPRESS_GZIP_LEVEL, zlib.DEFLATED,
+                16 + zlib.MAX_WBITS)
+            self.process = self.compressor.compress
+            self.flush = lambda: self.compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = self.compressor.flush
+
+    def stream(self, chunks, view_name):
+        raw = packed = buffered = 0
+        cpu = 0.0
+        buffer = []
+        for chunk in chunks:
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered < settings.COMPRESS_STREAM_BUFFER:
+                continue
+            started = time.thread_time()
+            data = self.process(b''.join(buffer)) + self.flush()
+            cpu += time.thread_time() - started
+            raw += buffered
+            packed += len(data)
+            buffer, buffered = [], 0
+            if data:
+                yield data
+        started = time.thread_time()
+        tail = self.process(b''.join(buffer)) + self.finish()
+        cpu += time.thread_time() - started
+        raw += buffered
+        packed += len(tail)
+        record(view_name, raw, packed, cpu)
+        if tail:
+            yield tail
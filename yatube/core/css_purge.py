@@ -0,0 +1,122 @@
+import os
+import re
+
+from django.template import engines
+
+TOKEN_RE = re.compile(r'[\w-]+')
+# классы и id в селекторе; экранированные символы не поддерживаем
+SELECTOR_NAME_RE = re.compile(r'[.#](-?[_a-zA-Z][\w-]*)')
+# at-правила с вложенными правилами, внутри которых тоже чистим
+NESTED_AT_RULES = ('@media', '@supports', '@document')
+
+
+def template_tokens():
+    """Все слова из шаблонов проекта: по ним решаем, какие классы
+    используются. Лишнее слово только оставит правило, а не удалит."""
+    tokens = set()
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            for root, _, files in os.walk(directory):
+                for filename in files:
+                    if filename.endswith(('.html', '.txt')):
+                        path = os.path.join(root, filename)
+                        with open(path, encoding='utf-8') as file:
+                            tokens.update(TOKEN_RE.findall(file.read()))
+
+    return tokens
+
+
+def _split_top(text, separator):
+    """Делит text по separator вне круглых скобок."""
+    parts, depth, start = [], 0, 0
+    for index, char in enumerate(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+
+    return parts
+
+
+def _skip_string(css, index):
+    quote = css[index]
+    index += 1
+    while index < len(css) and css[index] != quote:
+        index += 2 if css[index] == '\\' else 1
+
+    return index + 1
+
+
+def _statements(css):
+    """Разбирает CSS верхнего уровня на (prelude, body) для блоков
+    и (statement, None) для инструкций вида @charset ...;"""
+    index, start, length = 0, 0, len(css)
+    while index < length:
+        char = css[index]
+        if char in '"\'':
+            index = _skip_string(css, index)
+            continue
+        if css.startswith('/*', index):
+            end = css.find('*/', index + 2)
+            index = length if end == -1 else end + 2
+            # лицензионные комментарии /*! ... */ сохраняем
+            if not css.startswith('/*!', start):
+                start = index
+            continue
+        if char == ';':
+            yield css[start:index + 1], None
+            index = start = index + 1
+            continue
+        if char == '{':
+            depth, body_start = 1, index + 1
+            index += 1
+            while index < length and depth:
+                if css[index] in '"\'':
+                    index = _skip_string(css, index)
+                    continue
+                depth += {'{': 1, '}': -1}.get(css[index], 0)
+                index += 1
+            yield css[start:body_start - 1], css[body_start:index - 1]
+            start = index
+            continue
+        index += 1
+    if css[start:].strip():
+        yield css[start:], None
+
+
+def _selector_used(selector, used):
+    return all(name in used for name in SELECTOR_NAME_RE.findall(selector))
+
+
+def purge_css(css, used):
+    """Удаляет из css правила, селекторы которых ссылаются на классы
+    и id, отсутствующие в used. Из списка селекторов остаются
+    только используемые; пустые @media выбрасываются."""
+    output = []
+    for prelude, body in _statements(css):
+        if body is None:
+            output.append(prelude)
+            continue
+        head = prelude.strip()
+        if head.startswith(NESTED_AT_RULES):
+            inner = purge_css(body, used)
+            if inner.strip():
+                output.append(f'{prelude}{{{inner}}}')
+        elif head.startswith('@'):
+            output.append(f'{prelude}{{{body}}}')
+        else:
+            # комментарий перед правилом остаётся только при нём
+            comment, _, selectors = prelude.rpartition('*/')
+            kept = [
+                selector for selector in _split_top(selectors, ',')
+                if _selector_used(selector, used)
+            ]
+            if kept:
+                prefix = f'{comment}*/' if comment else ''
+                output.append(f'{prefix}{",".join(kept)}{{{body}}}')
+
+    return ''.join(output)
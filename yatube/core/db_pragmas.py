@@ -0,0 +1,21 @@
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# PRAGMA не принимает параметры запроса: пускаем только имена и числа
+PRAGMA_RE = re.compile(r'^-?\w+$')
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Выполняет PRAGMA из SQLITE_PRAGMAS на каждом новом соединении
+    SQLite (сигнал connection_created)."""
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if not (PRAGMA_RE.match(name) and PRAGMA_RE.match(str(value))):
+                raise ImproperlyConfigured(
+                    f'Неверная PRAGMA в SQLITE_PRAGMAS: {name}={value}')
+            cursor.execute(f'PRAGMA {name} = {value}')
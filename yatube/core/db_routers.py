@@ -0,0 +1,37 @@
+from contextvars import ContextVar
+from itertools import count
+
+from django.conf import settings
+
+PRIMARY = 'default'
+
+# alias реплики для чтения в текущем запросе; None - читаем с основной
+read_alias = ContextVar('read_alias', default=None)
+_next_replica = count()
+
+
+def pick_replica():
+    """Следующая реплика по кругу или None, если реплик нет."""
+    replicas = getattr(settings, 'DATABASE_REPLICAS', ())
+    if not replicas:
+        return None
+
+    return replicas[next(_next_replica) % len(replicas)]
+
+
+class ReplicaRouter:
+    """Чтение - с реплики, выбранной для запроса middleware,
+    запись и всё остальное - в основную базу."""
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get() or PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # реплики - копии основной базы
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from core.template_profiler import TemplateProfile, profiling
+
+DUMMY_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    'post_cards': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Запрашивает страницы внутри процесса и печатает время рендера '
+        'шаблонов по шаблонам и типам узлов (include, for, url, ...).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'urls', nargs='*', default=['/'], help='Пути страниц.')
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument(
+            '--limit', type=int, default=25, help='Строк в отчёте.')
+        parser.add_argument(
+            '--user', help='Запрашивать от имени этого пользователя.')
+        parser.add_argument(
+            '--with-cache', action='store_true',
+            help='Не отключать кэш страниц и карточек постов.')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        if repeat < 1:
+            raise CommandError('--repeat должен быть больше нуля.')
+        host = next((
+            host for host in settings.ALLOWED_HOSTS
+            if '*' not in host and not host.startswith('.')
+        ), 'localhost')
+        client = Client(SERVER_NAME=host)
+        if options['user']:
+            user = get_user_model().objects.filter(
+                username=options['user']).first()
+            if user is None:
+                raise CommandError(
+                    f'Пользователь {options["user"]} не найден.')
+            client.force_login(user)
+
+        caches = {} if options['with_cache'] else {'CACHES': DUMMY_CACHES}
+        with override_settings(TEMPLATE_PROFILING=False, **caches):
+            for url in options['urls']:
+                total = TemplateProfile(f'{url} x{repeat}')
+                for _ in range(repeat):
+                    with profiling(url) as profile:
+                        response = client.get(url)
+                    if response.status_code != 200:
+                        raise CommandError(
+                            f'{url}: ответ {response.status_code}')
+                    total.merge(profile)
+                self.stdout.write(total.format(options['limit']))
+                self.stdout.write(
+                    f'в среднем {total.total * 1000 / repeat:.2f} мс '
+                    f'на запрос\n')
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.template_warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Компилирует все шаблоны проекта и сообщает о синтаксических '
+        'ошибках. Рабочие процессы прогревают кэш так же при старте '
+        '(TEMPLATES_WARMUP в yatube/wsgi.py).'
+    )
+
+    def handle(self, *args, **options):
+        results = warm_templates()
+        failed = [(name, error) for name, _, error in results if error]
+        for name, seconds, error in results:
+            if error is None and options['verbosity'] > 1:
+                self.stdout.write(f'{name}: {seconds * 1000:.2f} мс')
+        for name, error in failed:
+            self.stderr.write(f'{name}: {error}')
+        total = sum(seconds for _, seconds, _ in results)
+        self.stdout.write(
+            f'Скомпилировано шаблонов: {len(results) - len(failed)}, '
+            f'{total * 1000:.1f} мс')
+        if failed:
+            raise CommandError(f'Ошибок в шаблонах: {len(failed)}')
@@ -0,0 +1,231 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from . import template_profiler
+from .compression import (
+    COMPRESSIBLE_TYPES, StreamCompressor, compress, negotiate, record,
+)
+from .db_routers import pick_replica, read_alias
+
+logger = logging.getLogger('yatube.queries')
+
+STICKY_COOKIE = 'primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def add_server_timing(response, metric):
+    """Дописывает метрику в заголовок Server-Timing."""
+    if response.has_header('Server-Timing'):
+        metric = f'{response["Server-Timing"]}, {metric}'
+    response['Server-Timing'] = metric
+
+
+class ReplicaMiddleware:
+    """Направляет чтения view из REPLICA_READ_VIEWS на реплики.
+
+    После запроса на запись клиент REPLICA_STICKY_SECONDS секунд читает
+    с основной базы, чтобы видеть свои изменения, пока реплики догоняют.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = read_alias.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_alias.reset(token)
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(int(time.time()) + settings.REPLICA_STICKY_SECONDS),
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+            )
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (request.method in SAFE_METHODS
+                and not self.is_sticky(request)
+                and request.resolver_match.view_name
+                in settings.REPLICA_READ_VIEWS):
+            read_alias.set(pick_replica())
+
+    def is_sticky(self, request):
+        try:
+            until = int(request.COOKIES.get(STICKY_COOKIE, 0))
+        except ValueError:
+            return False
+
+        return until > time.time()
+
+
+class QueryStats:
+    """Счётчик запросов к БД за один HTTP-запрос.
+    Вызывается как execute_wrapper для всех соединений."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            self.statements[sql] += 1
+            if duration * 1000 >= settings.SLOW_QUERY_MS:
+                self.slow.append((duration, sql))
+
+    @property
+    def duplicates(self):
+        return sum(n - 1 for n in self.statements.values() if n > 1)
+
+
+class QueryProfilerMiddleware:
+    """Считает запросы, время в БД и повторы SQL для каждого запроса.
+
+    Итог пишется строкой в лог yatube.queries, запросы дольше
+    SLOW_QUERY_MS логируются отдельно с именем view. В заголовок
+    Server-Timing итог попадает только при DEBUG, SERVER_TIMING
+    или для staff: посторонним незачем видеть устройство базы.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else '-'
+        db_ms = stats.duration * 1000
+        if self.shows_timing(request):
+            add_server_timing(
+                response,
+                f'db;dur={db_ms:.1f};desc="{stats.count} queries, '
+                f'{stats.duplicates} duplicates"',
+            )
+        logger.info(
+            'view=%s method=%s status=%s queries=%d db_ms=%.1f '
+            'duplicates=%d',
+            view_name, request.method, response.status_code, stats.count,
+            db_ms, stats.duplicates,
+            extra={
+                'view_name': view_name,
+                'queries': stats.count,
+                'db_ms': round(db_ms, 1),
+                'duplicates': stats.duplicates,
+            },
+        )
+        for duration, sql in stats.slow:
+            logger.warning(
+                'slow query view=%s ms=%.1f sql=%s',
+                view_name, duration * 1000, sql,
+            )
+
+        return response
+
+    def shows_timing(self, request):
+        if settings.DEBUG or settings.SERVER_TIMING:
+            return True
+        user = getattr(request, 'user', None)
+
+        return user is not None and user.is_staff
+
+
+class TemplateProfilerMiddleware:
+    """Профилирует рендер шаблонов, если включён TEMPLATE_PROFILING.
+
+    Время по шаблонам и типам узлов складывается в recent_profiles
+    (страница debug/templates/), общее время - в Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        if not settings.TEMPLATE_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        label = f'{request.method} {request.get_full_path()}'
+        with template_profiler.profiling(label) as profile:
+            response = self.get_response(request)
+
+        if profile.stats:
+            template_profiler.recent_profiles.append(profile)
+            add_server_timing(
+                response, f'tpl;dur={profile.total * 1000:.1f}')
+
+        return response
+
+
+class CompressionMiddleware:
+    """Сжимает ответы brotli или gzip в зависимости от Accept-Encoding.
+
+    Несжимаемые типы и тела короче COMPRESS_MIN_SIZE отдаются как есть,
+    потоковые ответы сжимаются по порциям. Доля сжатия и время CPU
+    копятся по view в core.compression (страница debug/compression/).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.has_header('Content-Encoding')
+                or not response.get('Content-Type', '').startswith(
+                    COMPRESSIBLE_TYPES)
+                or not response.streaming
+                and len(response.content) < settings.COMPRESS_MIN_SIZE):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else '-'
+        if response.streaming:
+            response.streaming_content = StreamCompressor(encoding).stream(
+                response.streaming_content, view_name)
+            if response.has_header('Content-Length'):
+                del response['Content-Length']
+        else:
+            started = time.thread_time()
+            compressed = compress(response.content, encoding)
+            cpu = time.thread_time() - started
+            if len(compressed) >= len(response.content):
+                return response
+            record(view_name, len(response.content), len(compressed), cpu)
+            add_server_timing(
+                response,
+                f'compress;dur={cpu * 1000:.1f};desc="{encoding} '
+                f'{len(compressed) / len(response.content):.0%}"',
+            )
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        # байты тела изменились: сильный ETag становится слабым
+        etag = response.get('ETag', '')
+        if etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = encoding
+
+        return response
@@ -0,0 +1,124 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.utils.http import http_date
+
+# имя с хэшем содержимого от ManifestStaticFilesStorage: logo.3f2a9c1b7d4e.png
+HASHED_RE = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=60'
+# предпочтение: brotli, затем gzip
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+BLOCK_SIZE = 64 * 1024
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding, кроме запрещённых через q=0."""
+    accepted = set()
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = params.strip().replace(' ', '')
+        if name and quality not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(name.lower())
+
+    return accepted
+
+
+class StaticFile:
+    """Файл статики, его сжатые копии и готовые заголовки."""
+
+    def __init__(self, path, url):
+        stat = os.stat(path)
+        content_type, _ = mimetypes.guess_type(path)
+        self.path = path
+        self.headers = [
+            ('Content-Type', content_type or 'application/octet-stream'),
+            ('Cache-Control',
+             IMMUTABLE if HASHED_RE.search(url) else REVALIDATE),
+            ('Last-Modified', http_date(stat.st_mtime)),
+        ]
+        # слабый: один ETag на все сжатые варианты
+        self.etag = f'W/"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        self.variants = [(None, path, stat.st_size)]
+        for encoding, suffix in ENCODINGS:
+            if os.path.exists(path + suffix):
+                self.variants.insert(-1, (
+                    encoding, path + suffix, os.path.getsize(path + suffix)))
+        if len(self.variants) > 1:
+            self.headers.append(('Vary', 'Accept-Encoding'))
+
+    def pick(self, accept_encoding):
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, path, size in self.variants:
+            if encoding is None or encoding in accepted:
+                return encoding, path, size
+
+
+class FileIterator:
+    def __init__(self, file):
+        self.file = file
+
+    def __iter__(self):
+        return iter(lambda: self.file.read(BLOCK_SIZE), b'')
+
+    def close(self):
+        self.file.close()
+
+
+class StaticFilesApp:
+    """WSGI-слой, отдающий STATIC_ROOT без участия Django.
+
+    Файлы с хэшем в имени кэшируются браузером на год (immutable),
+    остальные перепроверяются через минуту. Если клиент принимает
+    brotli или gzip, отдаётся готовая сжатая копия из collectstatic.
+    Список файлов читается один раз при старте процесса.
+    """
+
+    def __init__(self, application, root, prefix):
+        self.application = application
+        self.files = {}
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(tuple(
+                        suffix for _, suffix in ENCODINGS)):
+                    continue
+                path = os.path.join(directory, filename)
+                url = prefix + os.path.relpath(path, root).replace(
+                    os.sep, '/')
+                self.files[url] = StaticFile(path, url)
+
+    def __call__(self, environ, start_response):
+        static = self.files.get(environ.get('PATH_INFO', ''))
+        method = environ['REQUEST_METHOD']
+        if static is None or method not in ('GET', 'HEAD'):
+            return self.application(environ, start_response)
+
+        headers = static.headers + [('ETag', static.etag)]
+        if environ.get('HTTP_IF_NONE_MATCH') == static.etag:
+            start_response('304 Not Modified', headers)
+            return []
+        encoding, path, size = static.pick(
+            environ.get('HTTP_ACCEPT_ENCODING', ''))
+        headers.append(('Content-Length', str(size)))
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        start_response('200 OK', headers)
+        if method == 'HEAD':
+            return []
+        file = open(path, 'rb')
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None:
+            return file_wrapper(file, BLOCK_SIZE)
+
+        return FileIterator(file)
+
+
+def static_application(application):
+    """Добавляет слой статики, если включён SERVE_STATIC."""
+    if not settings.SERVE_STATIC:
+        return application
+
+    return StaticFilesApp(
+        application, settings.STATIC_ROOT, settings.STATIC_URL)
@@ -0,0 +1,72 @@
+import gzip
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .css_purge import purge_css, template_tokens
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.ico', '.txt', '.json', '.map',
+                '.xml', '.html')
+# сжатая копия пишется, только если она заметно меньше оригинала
+MIN_RATIO = 0.95
+
+
+def compress_file(path):
+    """Пишет рядом с файлом .gz и, если доступен brotli, .br.
+    Возвращает список созданных файлов."""
+    with open(path, 'rb') as file:
+        content = file.read()
+    variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(content)))
+    written = []
+    for suffix, compressed in variants:
+        if len(compressed) < len(content) * MIN_RATIO:
+            with open(path + suffix, 'wb') as file:
+                file.write(compressed)
+            written.append(path + suffix)
+
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем в имени для collectstatic.
+
+    Перед хэшированием CSS из STATIC_PURGE_CSS очищается от правил
+    для классов, которых нет в шаблонах. После - у текстовых файлов
+    появляются сжатые копии .gz/.br для core.static.StaticFilesApp.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            self.purge(paths)
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for root, _, files in os.walk(self.location):
+            for filename in files:
+                if filename.endswith(COMPRESSIBLE):
+                    compress_file(os.path.join(root, filename))
+
+    def purge(self, paths):
+        names = [name for name in settings.STATIC_PURGE_CSS if name in paths]
+        if not names:
+            return
+        used = template_tokens() | set(settings.STATIC_PURGE_SAFELIST)
+        for name in names:
+            # читаем исходник: в STATIC_ROOT может лежать прошлая чистка,
+            # а collectstatic не копирует файл заново, пока он не изменится
+            source_storage, source_path = paths[name]
+            with source_storage.open(source_path) as file:
+                css = file.read().decode('utf-8')
+            self.delete(name)
+            self.save(name, ContentFile(purge_css(css, used).encode()))
+            # хэш считается по файлу из paths: подставляем очищенный
+            paths[name] = (self, name)
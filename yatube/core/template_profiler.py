@@ -0,0 +1,104 @@
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.template.base import Node
+
+# профиль текущего запроса; None - рендер без замеров
+current_profile = ContextVar('template_profile', default=None)
+# последние профили запросов этого процесса для отладочной страницы
+recent_profiles = deque(maxlen=50)
+
+_original_render_annotated = Node.render_annotated
+
+
+def _template_name(node):
+    origin = getattr(node, 'origin', None)
+
+    return getattr(origin, 'template_name', None) or '<unknown>'
+
+
+class TemplateProfile:
+    """Время рендера узлов шаблонов, сгруппированное по
+    (имя шаблона, тип узла). Для каждой группы: число вызовов,
+    полное время и собственное время без вложенных узлов."""
+
+    def __init__(self, label=''):
+        self.label = label
+        self.stats = defaultdict(lambda: [0, 0.0, 0.0])
+        self._children = []
+
+    def time_node(self, node, context):
+        self._children.append(0.0)
+        started = perf_counter()
+        try:
+            return _original_render_annotated(node, context)
+        finally:
+            elapsed = perf_counter() - started
+            nested = self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+            stat = self.stats[(_template_name(node), type(node).__name__)]
+            stat[0] += 1
+            stat[1] += elapsed
+            stat[2] += elapsed - nested
+
+    @property
+    def total(self):
+        """Собственное время всех узлов - полное время рендера."""
+        return sum(stat[2] for stat in self.stats.values())
+
+    def rows(self):
+        """(шаблон, узел, вызовы, полное мс, собственное мс),
+        сначала самые дорогие по собственному времени."""
+        rows = [
+            (template, node, calls, full * 1000, own * 1000)
+            for (template, node), (calls, full, own) in self.stats.items()
+        ]
+
+        return sorted(rows, key=lambda row: row[4], reverse=True)
+
+    def merge(self, other):
+        for key, (calls, full, own) in other.stats.items():
+            stat = self.stats[key]
+            stat[0] += calls
+            stat[1] += full
+            stat[2] += own
+
+    def format(self, limit=None):
+        lines = [
+            f'{self.label} total={self.total * 1000:.2f}ms',
+            f'{"template":40} {"node":24} {"calls":>7} '
+            f'{"full ms":>9} {"own ms":>9}',
+        ]
+        for template, node, calls, full, own in self.rows()[:limit]:
+            lines.append(
+                f'{template:40} {node:24} {calls:7d} {full:9.2f} {own:9.2f}')
+
+        return '\n'.join(lines)
+
+
+def _profiled_render_annotated(node, context):
+    profile = current_profile.get()
+    if profile is None:
+        return _original_render_annotated(node, context)
+
+    return profile.time_node(node, context)
+
+
+def install():
+    """Включает замеры: рендер каждого узла проходит через профиль."""
+    Node.render_annotated = _profiled_render_annotated
+
+
+@contextmanager
+def profiling(label=''):
+    """Собирает профиль рендера шаблонов внутри блока."""
+    install()
+    profile = TemplateProfile(label)
+    token = current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        current_profile.reset(token)
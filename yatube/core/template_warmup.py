@@ -0,0 +1,35 @@
+import os
+import time
+
+from django.template import engines
+
+
+def template_names(engine):
+    """Имена всех шаблонов из каталогов DIRS движка."""
+    for directory in engine.template_dirs:
+        for root, _, files in os.walk(directory):
+            for filename in sorted(files):
+                if filename.endswith(('.html', '.txt')):
+                    path = os.path.join(root, filename)
+                    yield os.path.relpath(path, directory).replace(
+                        os.sep, '/')
+
+
+def warm_templates():
+    """Компилирует шаблоны проекта, чтобы кэширующий загрузчик
+    отдавал их готовыми уже на первых запросах процесса.
+
+    Возвращает список (имя, время в секундах, ошибка или None).
+    """
+    results = []
+    for engine in engines.all():
+        for name in template_names(engine):
+            started = time.perf_counter()
+            error = None
+            try:
+                engine.get_template(name)
+            except Exception as exc:
+                error = exc
+            results.append((name, time.perf_counter() - started, error))
+
+    return results
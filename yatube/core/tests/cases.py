@@ -0,0 +1,16 @@
+from django.db import connection
+from django.test import TransactionTestCase
+
+
+class ResetSequencesTestCase(TransactionTestCase):
+    """TransactionTestCase, после которого id в SQLite снова с единицы.
+
+    Очистка базы после теста не сбрасывает счётчики id в SQLite
+    (reset_sequences в Django 2.2 для SQLite ничего не делает),
+    а следующие тесты обращаются к /posts/1/.
+    """
+
+    def tearDown(self):
+        super().tearDown()
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM sqlite_sequence')
@@ -0,0 +1,93 @@
+import asyncio
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.wsgi import get_wsgi_application
+
+from core.asgi import ASGIHandler
+from core.tests.cases import ResetSequencesTestCase
+from posts.models import Post
+
+User = get_user_model()
+
+
+class TestASGIHandler(ResetSequencesTestCase):
+    """Проверяем ASGI-приложение поверх WSGI-обработчика."""
+
+    def setUp(self):
+        cache.clear()
+        self.app = ASGIHandler(get_wsgi_application(), max_workers=2)
+
+    def tearDown(self):
+        self.app.executor.shutdown()
+        super().tearDown()
+
+    def request(self, path, method='GET', query=b'', body=b'', headers=()):
+        scope = {
+            'type': 'http', 'method': method, 'path': path,
+            'query_string': query, 'headers': list(headers),
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 5000),
+        }
+        messages = [{'type': 'http.request', 'body': body}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(self.app(scope, receive, send))
+        start = sent[0]
+        content = b''.join(message.get('body', b'') for message in sent[1:])
+
+        return start['status'], dict(start['headers']), content
+
+    def test_feed_page(self):
+        """Лента отдаётся через пул потоков с заголовками ответа."""
+        author = User.objects.create_user(username='Artem')
+        Post.objects.create(author=author, text='Пост через ASGI')
+        status, headers, content = self.request('/')
+        self.assertEqual(status, 200)
+        self.assertIn(b'text/html', headers[b'content-type'])
+        self.assertIn('Пост через ASGI', content.decode())
+
+    def test_query_string_and_post_body(self):
+        status, _, content = self.request('/search/', query=b'q=ASGI')
+        self.assertEqual(status, 200)
+        self.assertIn(b'ASGI', content)
+        # POST без CSRF-токена доходит до Django и отклоняется
+        status, _, _ = self.request(
+            '/create/', method='POST', body=b'text=x',
+            headers=[(b'content-type',
+                      b'application/x-www-form-urlencoded')])
+        self.assertEqual(status, 403)
+
+    def test_streaming_response(self):
+        """Потоковая выгрузка отправляется по частям; cookie
+        из нескольких заголовков склеиваются, как в HTTP/2."""
+        staff = User.objects.create_user('admin', is_staff=True)
+        Post.objects.create(author=staff, text='Выгрузка')
+        self.client.force_login(staff)
+        cookie = f'sessionid={self.client.cookies["sessionid"].value}'
+        status, headers, content = self.request(
+            '/export/', query=b'format=jsonl',
+            headers=[(b'cookie', b'theme=dark'),
+                     (b'cookie', cookie.encode())])
+        self.assertEqual(status, 200)
+        self.assertIn('Выгрузка', content.decode())
+
+    def test_lifespan(self):
+        messages = [{'type': 'lifespan.startup'},
+                    {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        asyncio.run(self.app({'type': 'lifespan'}, receive, send))
+        self.assertEqual(
+            sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
@@ -0,0 +1,84 @@
+import gzip
+from unittest import skipIf
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.compression import (
+    StreamCompressor, brotli, compression_stats, negotiate,
+)
+from posts.models import Post
+
+User = get_user_model()
+
+
+class TestCompressionMiddleware(TestCase):
+    """Проверяем сжатие ответов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('admin', is_staff=True)
+        Post.objects.bulk_create(
+            Post(author=cls.staff, text=f'Пост для сжатия {i}')
+            for i in range(10))
+
+    def setUp(self):
+        cache.clear()
+        compression_stats.clear()
+
+    def test_negotiate(self):
+        self.assertEqual(negotiate('gzip, deflate'), 'gzip')
+        self.assertIsNone(negotiate('gzip;q=0, identity'))
+        self.assertIsNone(negotiate(''))
+
+    def test_feed_page_is_gzipped(self):
+        plain = self.client.get('/').content
+        cache.clear()
+        response = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertRegex(response['Server-Timing'], r'compress;dur=[\d.]+')
+        self.assertEqual(gzip.decompress(response.content), plain)
+        self.assertEqual(compression_stats['posts:home'][0], 1)
+
+    @skipIf(brotli is None, 'пакет Brotli не установлен')
+    def test_feed_page_brotli(self):
+        plain = self.client.get('/').content
+        cache.clear()
+        response = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), plain)
+
+    @override_settings(COMPRESS_MIN_SIZE=10 ** 6)
+    def test_small_body_not_compressed(self):
+        response = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_response_compressed_by_chunks(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(
+            '/export/', {'format': 'jsonl'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        body = gzip.decompress(b''.join(response.streaming_content))
+        self.assertEqual(body.decode().count('\n'), 10)
+        self.assertEqual(compression_stats['posts:export'][0], 1)
+
+        response = self.client.get('/debug/compression/')
+        self.assertContains(response, 'posts:export')
+
+    def test_small_chunks_buffered(self):
+        """Мелкие порции сжимаются пачками: размер близок к сжатию
+        всего тела разом, а не к сбросу на каждой строке."""
+        lines = [
+            f'{{"id": {i}, "text": "Строка выгрузки {i}"}}\n'.encode()
+            for i in range(5000)
+        ]
+        parts = list(StreamCompressor('gzip').stream(lines, 'bench'))
+        body = b''.join(parts)
+        self.assertEqual(gzip.decompress(body), b''.join(lines))
+        self.assertLess(len(parts), 50)
+        whole = gzip.compress(b''.join(lines))
+        self.assertLess(len(body), len(whole) * 1.2)
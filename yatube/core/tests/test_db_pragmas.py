@@ -0,0 +1,26 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from core.db_pragmas import apply_sqlite_pragmas
+
+
+class TestSQLitePragmas(TestCase):
+    """Проверяем PRAGMA для новых соединений SQLite."""
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -1234,
+                                       'busy_timeout': 777})
+    def test_pragmas_applied(self):
+        apply_sqlite_pragmas(None, connection)
+        self.assertEqual(self.pragma('cache_size'), -1234)
+        self.assertEqual(self.pragma('busy_timeout'), 777)
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': '1; DROP TABLE x'})
+    def test_invalid_pragma_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            apply_sqlite_pragmas(None, connection)
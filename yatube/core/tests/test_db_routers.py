@@ -0,0 +1,135 @@
+import os
+import tempfile
+from contextlib import ExitStack
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from core.db_routers import ReplicaRouter
+from core.middleware import STICKY_COOKIE, ReplicaMiddleware
+from core.tests.cases import ResetSequencesTestCase
+from posts.models import Post
+
+User = get_user_model()
+REPLICAS = ('replica1', 'replica2')
+
+
+@override_settings(DATABASE_REPLICAS=('replica1', 'replica2'))
+class TestReplicaRouting(SimpleTestCase):
+    """Проверяем выбор базы для чтения в запросе."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = ReplicaMiddleware(self.view)
+
+    def view(self, request):
+        self.middleware.process_view(request, None, (), {})
+        self.alias = ReplicaRouter().db_for_read(None)
+
+        return HttpResponse()
+
+    def request(self, path, method='get'):
+        request = getattr(self.factory, method)(path)
+        request.resolver_match = resolve(path)
+        response = self.middleware(request)
+
+        return self.alias, response
+
+    def test_read_views_use_replicas_round_robin(self):
+        """Чтение в view из списка идёт на реплики по кругу."""
+        aliases = {self.request('/')[0] for _ in range(4)}
+        self.assertEqual(aliases, {'replica1', 'replica2'})
+        self.assertIn(self.request('/about/tech/')[0], aliases)
+        self.assertEqual(ReplicaRouter().db_for_read(None), 'default')
+
+    def test_write_views_use_primary(self):
+        """view записи и POST-запросы читают с основной базы."""
+        self.assertEqual(self.request('/create/')[0], 'default')
+        self.assertEqual(
+            self.request('/auth/signup/', method='post')[0], 'default')
+
+    def test_read_your_writes(self):
+        """После POST клиент какое-то время читает с основной базы."""
+        alias, response = self.request('/create/', method='post')
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.factory.cookies[STICKY_COOKIE] = response.cookies[
+            STICKY_COOKIE].value
+        self.assertEqual(self.request('/')[0], 'default')
+        self.factory.cookies[STICKY_COOKIE] = '0'
+        self.assertNotEqual(self.request('/')[0], 'default')
+
+    @override_settings(DATABASE_REPLICAS=())
+    def test_without_replicas(self):
+        """Без реплик всё читается с основной базы."""
+        self.assertEqual(self.request('/')[0], 'default')
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class TestReplicaQueries(ResetSequencesTestCase):
+    """Запросы view чтения действительно выполняются на репликах -
+    двух локальных файлах SQLite, скопированных с основной базы."""
+
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create_user('Artem')
+        Post.objects.create(author=author, text='Пост на репликах')
+        self.tmp = tempfile.TemporaryDirectory()
+        source = connections['default']
+        source.ensure_connection()
+        for alias in REPLICAS:
+            path = os.path.join(self.tmp.name, f'{alias}.sqlite3')
+            connections.databases[alias] = {
+                'ENGINE': 'django.db.backends.sqlite3', 'NAME': path}
+            connections[alias].ensure_connection()
+            source.connection.backup(connections[alias].connection)
+        # реплики отстают: этого поста на них нет
+        Post.objects.create(author=author, text='Пост только в основной')
+
+    def tearDown(self):
+        for alias in REPLICAS:
+            connections[alias].close()
+            del connections[alias]
+            del connections.databases[alias]
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def get_home(self):
+        with ExitStack() as stack:
+            captured = {
+                alias: stack.enter_context(
+                    CaptureQueriesContext(connections[alias]))
+                for alias in REPLICAS
+            }
+            response = self.client.get('/')
+
+        return response, {
+            alias: len(context) for alias, context in captured.items()}
+
+    def test_reads_go_to_replicas(self):
+        """Главная читается с реплик по кругу и показывает их данные."""
+        response, first = self.get_home()
+        self.assertContains(response, 'Пост на репликах')
+        self.assertNotContains(response, 'Пост только в основной')
+        _, second = self.get_home()
+        self.assertEqual(
+            {alias for alias, count in first.items() if count}
+            | {alias for alias, count in second.items() if count},
+            set(REPLICAS),
+        )
+
+    def test_fresh_page_from_replica_not_cached(self):
+        """Страница с реплики сразу после изменения не кэшируется,
+        позже - кэшируется."""
+        self.get_home()
+        _, queries = self.get_home()
+        self.assertTrue(any(queries.values()))
+
+        with override_settings(REPLICA_STICKY_SECONDS=0):
+            self.get_home()
+            _, queries = self.get_home()
+        self.assertFalse(any(queries.values()))
@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+User = get_user_model()
+
+DB_TIMING = r'^db;dur=[\d.]+;desc="\d+ queries, \d+ duplicates"$'
+
+
+class TestQueryProfiler(TestCase):
+    """Проверяем профилирование SQL-запросов."""
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing_and_log(self):
+        """Ответ несёт Server-Timing, итог пишется в лог с именем view."""
+        with self.assertLogs('yatube.queries', 'INFO') as logs:
+            response = self.client.get('/')
+        self.assertRegex(response['Server-Timing'], DB_TIMING)
+        self.assertIn('view=posts:home', logs.output[0])
+        self.assertRegex(logs.output[0], r'queries=\d+ db_ms=[\d.]+')
+
+    def test_server_timing_hidden_from_visitors(self):
+        """Без DEBUG и SERVER_TIMING запросы видны только в логе."""
+        with self.assertLogs('yatube.queries', 'INFO') as logs:
+            response = self.client.get('/')
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertIn('view=posts:home', logs.output[0])
+
+    def test_server_timing_for_staff(self):
+        """Staff видит Server-Timing и без SERVER_TIMING."""
+        self.client.force_login(
+            User.objects.create_user(username='admin', is_staff=True))
+        response = self.client.get('/')
+        self.assertRegex(response['Server-Timing'], DB_TIMING)
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_queries_are_logged(self):
+        """Запросы дольше порога логируются предупреждением."""
+        with self.assertLogs('yatube.queries', 'WARNING') as logs:
+            self.client.get('/')
+        self.assertTrue(any(
+            'slow query view=posts:home' in line for line in logs.output))
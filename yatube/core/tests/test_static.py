@@ -0,0 +1,108 @@
+import io
+import shutil
+import tempfile
+from unittest import skipIf
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from core.css_purge import purge_css
+from core.static import IMMUTABLE, StaticFilesApp
+from core.storage import brotli
+
+
+class TestPurgeCSS(SimpleTestCase):
+    """Проверяем чистку CSS от неиспользуемых правил."""
+
+    def test_unused_rules_removed(self):
+        css = (
+            '@charset "UTF-8";/*! license */:root{--x:1}'
+            '.btn,.unused{color:red}.unused:hover{color:blue}'
+            'a{color:green}@media (min-width:1px){.unused{top:0}'
+            '.card{top:1px}}@media print{.unused{top:0}}'
+            '@keyframes spin{from{top:0}to{top:1px}}'
+        )
+        self.assertEqual(
+            purge_css(css, {'btn', 'card'}),
+            '@charset "UTF-8";/*! license */:root{--x:1}'
+            '.btn{color:red}a{color:green}'
+            '@media (min-width:1px){.card{top:1px}}'
+            '@keyframes spin{from{top:0}to{top:1px}}'
+        )
+
+
+class TestStaticPipeline(SimpleTestCase):
+    """Проверяем collectstatic и WSGI-слой статики."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.root = tempfile.mkdtemp()
+        cls.settings = override_settings(
+            STATIC_ROOT=cls.root,
+            STATICFILES_STORAGE=(
+                'core.storage.CompressedManifestStaticFilesStorage'),
+        )
+        cls.settings.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.app = StaticFilesApp(
+            lambda environ, start_response: 'django', cls.root, '/static/')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        shutil.rmtree(cls.root)
+        super().tearDownClass()
+
+    def get(self, path, **headers):
+        response = {}
+
+        def start_response(status, response_headers):
+            response['status'] = status
+            response['headers'] = dict(response_headers)
+
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path,
+                   'wsgi.input': io.BytesIO(), **headers}
+        body = self.app(environ, start_response)
+        if body == 'django':
+            return body, None, b''
+        content = b''.join(body)
+        if hasattr(body, 'close'):
+            body.close()
+
+        return response['status'], response['headers'], content
+
+    def test_hashed_css_is_purged_compressed_and_immutable(self):
+        url = staticfiles_storage.url('css/bootstrap.min.css')
+        self.assertRegex(url, r'bootstrap\.min\.[0-9a-f]{12}\.css$')
+        status, headers, plain = self.get(url)
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(headers['Cache-Control'], IMMUTABLE)
+        self.assertNotIn(b'.carousel', plain)
+        self.assertIn(b'.navbar', plain)
+
+        status, headers, packed = self.get(
+            url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertLess(len(packed), len(plain))
+
+        status, _, _ = self.get(url, HTTP_IF_NONE_MATCH=headers['ETag'])
+        self.assertEqual(status, '304 Not Modified')
+
+    @skipIf(brotli is None, 'пакет Brotli не установлен')
+    def test_brotli_copy_preferred(self):
+        url = staticfiles_storage.url('css/bootstrap.min.css')
+        _, _, plain = self.get(url)
+        _, headers, packed = self.get(
+            url, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(headers['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(packed), plain)
+
+    def test_unhashed_and_unknown_paths(self):
+        _, headers, _ = self.get('/static/img/logo.png')
+        self.assertNotEqual(headers['Cache-Control'], IMMUTABLE)
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertEqual(self.get('/static/nope.css')[0], 'django')
+        self.assertEqual(self.get('/')[0], 'django')
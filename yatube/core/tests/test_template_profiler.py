@@ -0,0 +1,64 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+
+from core.template_profiler import profiling, recent_profiles
+
+User = get_user_model()
+
+
+class TestTemplateProfiler(TestCase):
+    """Проверяем профилирование рендера шаблонов."""
+
+    def setUp(self):
+        cache.clear()
+        recent_profiles.clear()
+
+    def test_nested_nodes_split_own_time(self):
+        """Время считается по типам узлов, вложенные узлы
+        не попадают в собственное время родителя."""
+        template = Template('{% for i in items %}{{ i }}{% endfor %}')
+        with profiling() as profile:
+            template.render(Context({'items': range(3)}))
+        stats = {node: (calls, full, own)
+                 for _, node, calls, full, own in profile.rows()}
+        self.assertEqual(stats['ForNode'][0], 1)
+        self.assertEqual(stats['VariableNode'][0], 3)
+        self.assertLessEqual(stats['ForNode'][2], stats['ForNode'][1])
+
+    def test_disabled_by_default(self):
+        """Без TEMPLATE_PROFILING профили не собираются."""
+        response = self.client.get('/')
+        self.assertNotIn('tpl;', response.get('Server-Timing', ''))
+        self.assertFalse(recent_profiles)
+        staff = User.objects.create_user('admin', is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(
+            self.client.get('/debug/templates/').status_code, 404)
+
+    @override_settings(TEMPLATE_PROFILING=True)
+    def test_request_profile_and_debug_page(self):
+        """Профиль запроса виден в Server-Timing и на странице отчёта."""
+        response = self.client.get('/')
+        self.assertRegex(response['Server-Timing'], r'tpl;dur=[\d.]+')
+        self.assertEqual(len(recent_profiles), 1)
+        templates = {row[0] for row in recent_profiles[0].rows()}
+        self.assertIn('posts/index.html', templates)
+        self.assertIn('includes/header.html', templates)
+
+        staff = User.objects.create_user('admin', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get('/debug/templates/?limit=5')
+        self.assertContains(response, 'GET /')
+        self.assertContains(response, 'own ms')
+
+    def test_command_reports_templates(self):
+        """Команда печатает таблицу по шаблонам страницы."""
+        out = StringIO()
+        call_command('profile_templates', '/', repeat=2, stdout=out)
+        self.assertIn('/ x2', out.getvalue())
+        self.assertIn('posts/index.html', out.getvalue())
@@ -0,0 +1,24 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from core.template_warmup import warm_templates
+
+
+class TestWarmTemplates(SimpleTestCase):
+    """Проверяем прогрев шаблонов."""
+
+    def test_all_project_templates_compile(self):
+        """Все шаблоны проекта компилируются без ошибок."""
+        results = warm_templates()
+        names = {name for name, _, _ in results}
+        self.assertIn('posts/index.html', names)
+        self.assertIn('posts/includes/post_info.html', names)
+        self.assertEqual(
+            [(name, error) for name, _, error in results if error], [])
+
+    def test_command_reports_count(self):
+        out = StringIO()
+        call_command('warm_templates', stdout=out)
+        self.assertIn('Скомпилировано шаблонов', out.getvalue())
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponse
+
+from .compression import stats_rows
+from .template_profiler import TemplateProfile, recent_profiles
+
+
+@staff_member_required
+def template_profiles(request):
+    """Профили рендера последних запросов процесса и их сумма."""
+    if not settings.TEMPLATE_PROFILING:
+        raise Http404('Профилирование шаблонов выключено.')
+    profiles = list(recent_profiles)
+    summary = TemplateProfile(f'Всего запросов: {len(profiles)}')
+    for profile in profiles:
+        summary.merge(profile)
+    limit = int(request.GET['limit']) if request.GET.get(
+        'limit', '').isdigit() else 20
+    reports = [summary.format(limit)] + [
+        profile.format(limit) for profile in reversed(profiles)]
+
+    return HttpResponse(
+        '\n\n'.join(reports), content_type='text/plain; charset=utf-8')
+
+
+@staff_member_required
+def compression_stats(request):
+    """Сжатие ответов по view с момента запуска процесса."""
+    lines = [
+        f'{"view":32} {"responses":>9} {"raw KiB":>9} {"sent KiB":>9} '
+        f'{"ratio":>6} {"cpu ms":>7}'
+    ]
+    for view, count, raw, packed, ratio, cpu in stats_rows():
+        lines.append(
+            f'{view:32} {count:9d} {raw:9.1f} {packed:9.1f} '
+            f'{ratio:6.1%} {cpu:7.2f}')
+
+    return HttpResponse(
+        '\n'.join(lines), content_type='text/plain; charset=utf-8')
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import Post, Group
+from .search import build_match, fts_available, matching_ids
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -17,6 +18,15 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date', 'group')
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по тексту через полнотекстовый индекс вместо LIKE."""
+        match = build_match(search_term)
+        if not (match and fts_available()):
+            return super().get_search_results(
+                request, queryset, search_term)
+
+        return queryset.filter(pk__in=matching_ids(match)), False
+
 
 admin.site.register(Group)
 admin.site.register(Post, PostAdmin)
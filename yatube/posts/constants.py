@@ -5,7 +5,40 @@ NUM_PAGE = 10
 TEST_PAGE_2 = 6
 
 
+"""Сколько соседних страниц показывать по обе стороны от текущей."""
+PAGE_WINDOW = 2
+
+
 """Константа количества выведенных символов в модели Post."""
 POST_NUM = 15
 
 """Функция сравнения данных для поста(Тест)."""
+
+"""Кэш и имя фрагмента карточки поста, view, которые её выводят."""
+POST_CARD_CACHE = 'post_cards'
+POST_CARD_FRAGMENT = 'post_card'
+POST_CARD_VIEWS = (
+    'posts:home', 'posts:group', 'posts:profile', 'posts:follow_index',
+)
+
+"""Время жизни карточки поста в кэше, в секундах. Карточки сбрасываются
+сигналами; срок - страховка для процессов, до которых сброс не дошёл."""
+POST_CARD_TIMEOUT = 60 * 60
+
+"""Ширины миниатюр картинки поста для srcset, в пикселях."""
+THUMBNAIL_WIDTHS = (320, 640, 960)
+
+"""Время жизни закэшированной страницы ленты для анонимов, в секундах."""
+PAGE_CACHE_TIMEOUT = 60 * 15
+
+"""Сколько секунд хранить в кэше число постов ленты для паджинатора."""
+COUNT_CACHE_TIMEOUT = 60 * 5
+
+"""Сколько последних записей хранить в ленте подписок пользователя."""
+TIMELINE_SIZE = 500
+
+"""С какого числа подписчиков посты не рассылаются по лентам,
+а подтягиваются при чтении. Список таких авторов и групп
+пересчитывается раз в CELEBRITIES_TIMEOUT секунд."""
+CELEBRITY_FOLLOWERS = 1000
+CELEBRITIES_TIMEOUT = 60 * 10
@@ -0,0 +1,74 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Post
+
+EXPORT_FIELDS = ('id', 'text', 'pub_date', 'author__username', 'group__slug')
+EXPORT_HEADER = ('id', 'text', 'pub_date', 'author', 'group')
+EXPORT_FORMATS = ('csv', 'jsonl')
+CHUNK_SIZE = 2000
+
+
+def export_rows(group=None, author=None, since=None, until=None,
+                chunk_size=CHUNK_SIZE):
+    """Кортежи постов для выгрузки, читаются из БД порциями.
+
+    group - slug группы, author - username, since/until - даты
+    YYYY-MM-DD включительно. Неверная дата -> ValueError.
+    """
+    posts = Post.objects.order_by('id')
+    if group:
+        posts = posts.filter(group__slug=group)
+    if author:
+        posts = posts.filter(author__username=author)
+    # границы дней, а не pub_date__date: функция над столбцом
+    # не даёт использовать индексы по pub_date
+    if since:
+        posts = posts.filter(pub_date__gte=_day_start(since))
+    if until:
+        posts = posts.filter(
+            pub_date__lt=_day_start(until) + timedelta(days=1))
+
+    return posts.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def _day_start(value):
+    """Начало дня YYYY-MM-DD в текущем часовом поясе."""
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f'Неверная дата: {value}')
+
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class _Echo:
+    """Файлоподобный объект для csv.writer: отдаёт строку обратно."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_HEADER)
+    for post_id, text, pub_date, author, group in rows:
+        yield writer.writerow(
+            (post_id, text, pub_date.isoformat(), author, group or ''))
+
+
+def jsonl_lines(rows):
+    for post_id, text, pub_date, author, group in rows:
+        yield json.dumps(
+            dict(zip(EXPORT_HEADER, (
+                post_id, text, pub_date.isoformat(), author, group))),
+            ensure_ascii=False,
+        ) + '\n'
+
+
+def export_lines(rows, fmt):
+    """Построчная выгрузка в формате fmt (csv или jsonl)."""
+    return csv_lines(rows) if fmt == 'csv' else jsonl_lines(rows)
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from posts.constants import NUM_PAGE
+from posts.models import Post, Group, User
+from posts.timeline import timeline_posts
+
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+def feed_querysets():
+    """Запросы лент в том виде, в каком их выполняют view."""
+    feeds = {
+        'posts:home': Post.objects.feed(),
+        'posts:group': Group(pk=1).posts.feed(),
+        'posts:profile': User(pk=1).posts.feed(),
+    }
+    for view_name, posts in feeds.items():
+        yield view_name, 'page', posts[NUM_PAGE:NUM_PAGE * 2]
+        yield view_name, 'cursor', posts.order_by(
+            '-pub_date', '-id')[:NUM_PAGE + 1]
+    yield 'posts:follow_index', 'page', timeline_posts(User(pk=1))[
+        NUM_PAGE:NUM_PAGE * 2]
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет EXPLAIN QUERY PLAN для запросов лент и завершается '
+        'ошибкой, если SQLite сортирует выборку во временном B-дереве.'
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда поддерживает только SQLite.')
+        failed = []
+        with connection.cursor() as cursor:
+            for view_name, mode, posts in feed_querysets():
+                sql, params = posts.query.sql_with_params()
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                plan = [row[-1] for row in cursor.fetchall()]
+                sorted_in_temp = any(TEMP_SORT in step for step in plan)
+                status = 'FAIL' if sorted_in_temp else 'OK'
+                self.stdout.write(f'{status} {view_name} ({mode})')
+                for step in plan:
+                    self.stdout.write(f'    {step}')
+                if sorted_in_temp:
+                    failed.append(f'{view_name} ({mode})')
+        if failed:
+            raise CommandError(
+                'Сортировка без индекса: ' + ', '.join(failed))
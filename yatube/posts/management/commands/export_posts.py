@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import CHUNK_SIZE, EXPORT_FORMATS, export_lines, export_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает посты с автором и группой в CSV или JSONL. '
+        'Память не растёт с размером выгрузки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=EXPORT_FORMATS, default='jsonl')
+        parser.add_argument(
+            '--output', default='-',
+            help='Путь к файлу или "-" для стандартного вывода.')
+        parser.add_argument('--group', help='slug группы.')
+        parser.add_argument('--author', help='username автора.')
+        parser.add_argument('--since', help='Дата YYYY-MM-DD включительно.')
+        parser.add_argument('--until', help='Дата YYYY-MM-DD включительно.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            rows = export_rows(
+                group=options['group'],
+                author=options['author'],
+                since=options['since'],
+                until=options['until'],
+                chunk_size=options['chunk_size'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        lines = export_lines(rows, options['format'])
+        if options['output'] == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', newline='',
+                  encoding='utf-8') as output:
+            output.writelines(lines)
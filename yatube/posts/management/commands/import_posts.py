@@ -0,0 +1,213 @@
+import csv
+import json
+import sys
+import time
+from collections import Counter, OrderedDict
+from itertools import islice
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+from django.utils import timezone
+
+from posts.models import Group, Post, User
+from posts.page_cache import (
+    SITE_SCOPE, bump_page_generations, local_cache_warning,
+)
+from posts.timeline import refill
+from posts.utils import keep_dates, shift_post_counts
+
+
+class LookupCache:
+    """Ограниченный LRU-кэш соответствий ключ -> id.
+    Недостающие ключи подгружаются одним запросом на пачку."""
+
+    def __init__(self, queryset, field, maxsize):
+        self.queryset = queryset
+        self.field = field
+        self.maxsize = maxsize
+        self.ids = OrderedDict()
+
+    def load(self, keys):
+        missing = {key for key in keys if key and key not in self.ids}
+        if missing:
+            found = self.queryset.filter(
+                **{f'{self.field}__in': missing}
+            ).values_list(self.field, 'id')
+            for key, pk in found:
+                self.remember(key, pk)
+
+    def remember(self, key, pk):
+        self.ids[key] = pk
+        self.ids.move_to_end(key)
+        while len(self.ids) > self.maxsize:
+            self.ids.popitem(last=False)
+
+    def get(self, key):
+        pk = self.ids.get(key)
+        if pk is not None:
+            self.ids.move_to_end(key)
+
+        return pk
+
+
+# поля записи; в JSONL каждое должно быть строкой или отсутствовать
+ROW_FIELDS = ('text', 'author', 'group', 'pub_date')
+
+
+def well_formed(row):
+    """Запись - объект, поля которого строки или null."""
+    return isinstance(row, dict) and all(
+        isinstance(row.get(field), (str, type(None)))
+        for field in ROW_FIELDS
+    )
+
+
+def read_rows(stream, fmt):
+    """Построчно читает записи, не загружая файл в память."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for number, line in enumerate(stream, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as error:
+                raise CommandError(f'Строка {number}: {error}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из JSONL или CSV (поля text, author, group, '
+        'pub_date) пачками через bulk_create. Файл читается потоково. '
+        'Строки без текста, с неизвестным автором или группой '
+        'пропускаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Путь к файлу или "-" для стандартного ввода.')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='Формат файла; по умолчанию по расширению.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--cache-size', type=int, default=10000,
+            help='Сколько авторов и групп держать в памяти.')
+        parser.add_argument(
+            '--create-authors', action='store_true',
+            help='Создавать отсутствующих авторов без пароля.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or (
+            'csv' if path.lower().endswith('.csv') else 'jsonl')
+        self.batch_size = options['batch_size']
+        if self.batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        self.create_authors = options['create_authors']
+        # ключи одной пачки не должны вытеснять друг друга
+        cache_size = max(options['cache_size'], self.batch_size)
+        self.authors = LookupCache(User.objects.all(), 'username', cache_size)
+        self.groups = LookupCache(Group.objects.all(), 'slug', cache_size)
+        self.imported = self.skipped = 0
+        self.author_posts, self.group_posts = Counter(), Counter()
+        self.started = time.monotonic()
+
+        try:
+            if path == '-':
+                self.import_stream(sys.stdin, fmt)
+            else:
+                with open(path, newline='', encoding='utf-8') as stream:
+                    self.import_stream(stream, fmt)
+        finally:
+            # и при ошибке в файле: уже записанные пачки остаются
+            self.after_import()
+        self.report('Готово')
+
+    def after_import(self):
+        """bulk_create обходит сигналы: чиним счётчики, числа постов
+        лент в кэше, ленты подписок и сбрасываем страницы. Кэш
+        серверов сбрасывается, только если он общий с командой."""
+        call_command('recount_posts', stdout=self.stdout)
+        for author_id, count in self.author_posts.items():
+            shift_post_counts(count, author_id=author_id)
+        for group_id, count in self.group_posts.items():
+            shift_post_counts(count, group_id=group_id)
+        refill(self.author_posts, self.group_posts)
+        bump_page_generations(SITE_SCOPE, 'home')
+        warning = local_cache_warning()
+        if warning:
+            self.stderr.write(warning)
+
+    def import_stream(self, stream, fmt):
+        rows = read_rows(stream, fmt)
+        with keep_dates():
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                self.import_batch(batch)
+                self.report('Импортировано')
+
+    @transaction.atomic
+    def import_batch(self, batch):
+        # строка JSONL может оказаться массивом, числом или объектом
+        # с полями не тех типов
+        rows = [row for row in batch if well_formed(row)]
+        self.skipped += len(batch) - len(rows)
+        self.authors.load(row.get('author') for row in rows)
+        self.groups.load(row.get('group') for row in rows)
+        now = timezone.now()
+        posts = []
+        for row in rows:
+            author_id = self.author_id(row.get('author'))
+            group_id = self.groups.get(row.get('group'))
+            if author_id is None or not row.get('text') or (
+                    row.get('group') and group_id is None):
+                self.skipped += 1
+                continue
+            pub_date = now
+            if row.get('pub_date'):
+                try:
+                    # None - не дата, ValueError - дата вроде 30 февраля
+                    pub_date = parse_datetime(row['pub_date'])
+                except (ValueError, TypeError):
+                    pub_date = None
+                if pub_date is None:
+                    self.skipped += 1
+                    continue
+                if timezone.is_naive(pub_date):
+                    pub_date = timezone.make_aware(pub_date)
+            posts.append(Post(
+                text=row['text'],
+                author_id=author_id,
+                group_id=group_id,
+                pub_date=pub_date,
+                updated_at=pub_date,
+            ))
+        Post.objects.bulk_create(posts, batch_size=self.batch_size)
+        self.imported += len(posts)
+        self.author_posts.update(post.author_id for post in posts)
+        self.group_posts.update(
+            post.group_id for post in posts if post.group_id is not None)
+
+    def author_id(self, username):
+        author_id = self.authors.get(username)
+        if author_id is None and username and self.create_authors:
+            author = User(username=username)
+            author.set_unusable_password()
+            author.save()
+            self.authors.remember(username, author.id)
+            author_id = author.id
+
+        return author_id
+
+    def report(self, prefix):
+        elapsed = time.monotonic() - self.started
+        rate = self.imported / elapsed if elapsed else 0
+        self.stdout.write(
+            f'{prefix}: {self.imported} постов, пропущено {self.skipped}, '
+            f'{elapsed:.1f} с, {rate:.0f} постов/с'
+        )
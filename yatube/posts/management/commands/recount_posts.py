@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from posts.models import AuthorPostsCounter, Group, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчики постов авторов и групп по таблице постов. '
+        'Нужна после bulk_create и правок в обход ORM.'
+    )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        groups = list(Group.objects.annotate(actual=Count('posts')))
+        drifted_groups = [
+            group for group in groups if group.posts_count != group.actual]
+        for group in drifted_groups:
+            group.posts_count = group.actual
+        Group.objects.bulk_update(drifted_groups, ['posts_count'])
+
+        actual = dict(
+            Post.objects.order_by().values_list('author').annotate(
+                Count('id')))
+        stored = dict(
+            AuthorPostsCounter.objects.values_list('author', 'posts_count'))
+        drifted_authors = {
+            author_id for author_id in actual.keys() | stored.keys()
+            if actual.get(author_id, 0) != stored.get(author_id)
+        }
+        AuthorPostsCounter.objects.filter(
+            author__in=drifted_authors).delete()
+        AuthorPostsCounter.objects.bulk_create(
+            AuthorPostsCounter(author_id=author_id, posts_count=count)
+            for author_id, count in actual.items()
+            if author_id in drifted_authors
+        )
+
+        self.stdout.write(
+            f'Исправлено счётчиков: групп {len(drifted_groups)}, '
+            f'авторов {len(drifted_authors)}.'
+        )
@@ -0,0 +1,126 @@
+import random
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from posts.models import Group, Post, User
+from posts.page_cache import (
+    SITE_SCOPE, bump_page_generations, local_cache_warning,
+)
+from posts.utils import keep_dates
+
+
+def batched(items, size):
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу случайными пользователями, группами и постами '
+        '(Faker + bulk_create) для нагрузочных тестов и бенчмарков.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько последних дней раскидать даты постов.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--password', default='benchmark',
+            help='Общий пароль созданных пользователей.')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['batch_size']) < 1:
+            raise CommandError(
+                '--users и --batch-size должны быть больше нуля.')
+        self.batch_size = options['batch_size']
+        self.fake = Faker('ru_RU')
+        if options['seed'] is not None:
+            Faker.seed(options['seed'])
+            random.seed(options['seed'])
+        started = time.monotonic()
+
+        # хэш пароля считается один раз: он намеренно медленный
+        self.create_users(options['users'], make_password(
+            options['password']))
+        self.create_groups(options['groups'])
+        self.create_posts(options['posts'], options['days'])
+
+        call_command('recount_posts', stdout=self.stdout)
+        bump_page_generations(SITE_SCOPE, 'home')
+        warning = local_cache_warning()
+        if warning:
+            self.stderr.write(warning)
+        self.stdout.write(
+            f'Готово: пользователей {options["users"]}, '
+            f'групп {options["groups"]}, постов {options["posts"]}, '
+            f'{time.monotonic() - started:.1f} с'
+        )
+
+    def create_users(self, count, password):
+        start = User.objects.count()
+        users = (
+            User(
+                username=f'{self.fake.user_name()}_{start + i}',
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                password=password,
+            )
+            for i in range(count)
+        )
+        for batch in batched(users, self.batch_size):
+            User.objects.bulk_create(batch)
+
+    def create_groups(self, count):
+        start = Group.objects.count()
+        groups = (
+            Group(
+                title=self.fake.catch_phrase()[:200],
+                slug=f'group-{start + i}',
+                description=self.fake.paragraph(),
+            )
+            for i in range(count)
+        )
+        for batch in batched(groups, self.batch_size):
+            Group.objects.bulk_create(batch)
+
+    def create_posts(self, count, days):
+        author_ids = list(User.objects.values_list('id', flat=True))
+        # каждый третий пост без группы
+        group_ids = list(Group.objects.values_list('id', flat=True))
+        group_ids += [None] * (len(group_ids) // 2 or 1)
+        now = timezone.now()
+        span = int(timedelta(days=days).total_seconds())
+        texts = [self.fake.paragraph(nb_sentences=5) for _ in range(1000)]
+
+        def posts():
+            for _ in range(count):
+                pub_date = now - timedelta(seconds=random.randint(0, span))
+                yield Post(
+                    text=random.choice(texts),
+                    author_id=random.choice(author_ids),
+                    group_id=random.choice(group_ids),
+                    pub_date=pub_date,
+                    updated_at=pub_date,
+                )
+
+        with keep_dates():
+            for batch in batched(posts(), self.batch_size):
+                with transaction.atomic():
+                    Post.objects.bulk_create(batch)
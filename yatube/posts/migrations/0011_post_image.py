@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-18 09:12
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+fts = import_module('posts.migrations.0009_post_fts')
+
+# таблица постов пересоздаётся: триггеры полнотекстового индекса
+# ставятся заново после неё в обе стороны
+RESTORE_TRIGGERS = fts.run_on_sqlite(
+    ('DROP TRIGGER IF EXISTS posts_post_fts_update',
+     'DROP TRIGGER IF EXISTS posts_post_fts_delete',
+     'DROP TRIGGER IF EXISTS posts_post_fts_insert',
+     *fts.TRIGGERS_SQL)
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_subscriptions_timeline'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, RESTORE_TRIGGERS),
+        migrations.AddField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, help_text='Картинка к посту', upload_to='posts/', verbose_name='Картинка'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='thumbnails',
+            field=models.TextField(blank=True, editable=False, help_text='Строки «имя ширина высота», заполняются в фоне', verbose_name='Миниатюры картинки'),
+        ),
+        migrations.RunPython(RESTORE_TRIGGERS, migrations.RunPython.noop),
+    ]
@@ -5,6 +5,19 @@ from .constants import POST_NUM
 
 User = get_user_model()
 
+FEED_FIELDS = (
+    'id',
+    'text',
+    'pub_date',
+    'updated_at',
+    'author__username',
+    'author__first_name',
+    'author__last_name',
+    'group__slug',
+    'image',
+    'thumbnails',
+)
+
 
 class Group(models.Model):
     """Модель группы."""
@@ -12,11 +25,48 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0,
+        editable=False,
+    )
 
     def __str__(self):
         return self.title
 
 
+class AuthorPostsCounter(models.Model):
+    """Счётчик постов автора (модель пользователя не расширяем)."""
+
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='posts_counter',
+        verbose_name='Автор',
+    )
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Счётчик постов автора'
+        verbose_name_plural = 'Счётчики постов авторов'
+
+    def __str__(self):
+        return f'{self.author_id}: {self.posts_count}'
+
+
+class PostQuerySet(models.QuerySet):
+    """Запросы постов."""
+
+    def feed(self):
+        """Посты для лент: автор и группа одним запросом,
+        только столбцы, которые выводит карточка поста."""
+        return self.select_related('author', 'group').only(*FEED_FIELDS)
+
+
 class Post(models.Model):
     """Модель поста."""
 
@@ -28,6 +78,10 @@ class Post(models.Model):
         'Дата публикации',
         auto_now_add=True,
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -44,11 +98,124 @@ class Post(models.Model):
         help_text='Группа, к которой будет относиться пост',
 
     )
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        blank=True,
+        help_text='Картинка к посту',
+    )
+    thumbnails = models.TextField(
+        'Миниатюры картинки',
+        blank=True,
+        editable=False,
+        help_text='Строки «имя ширина высота», заполняются в фоне',
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('pub_date', 'id'),
+                name='post_pub_date_id_idx',
+            ),
+            models.Index(
+                fields=('group', 'pub_date'),
+                name='post_group_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+        )
         verbose_name = "Пост"
         verbose_name_plural = "Список постов"
 
     def __str__(self):
         return self.text[:POST_NUM]
+
+
+class Subscription(models.Model):
+    """Подписка пользователя на автора или на группу."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='subscriptions',
+        verbose_name='Подписчик',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='subscribers',
+        blank=True,
+        null=True,
+        verbose_name='Автор',
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='subscribers',
+        blank=True,
+        null=True,
+        verbose_name='Группа',
+    )
+
+    class Meta:
+        verbose_name = 'Подписка'
+        verbose_name_plural = 'Подписки'
+        constraints = (
+            models.CheckConstraint(
+                check=(
+                    models.Q(author__isnull=False, group__isnull=True)
+                    | models.Q(author__isnull=True, group__isnull=False)
+                ),
+                name='subscription_author_or_group',
+            ),
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_author_subscription',
+            ),
+            models.UniqueConstraint(
+                fields=('user', 'group'),
+                name='unique_group_subscription',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.author_id or self.group_id}'
+
+
+class TimelineEntry(models.Model):
+    """Запись персональной ленты: пост, разосланный подписчику при
+    публикации. pub_date скопирована из поста, чтобы лента читалась
+    одним проходом по индексу (user, pub_date)."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Запись ленты подписок'
+        verbose_name_plural = 'Лента подписок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='unique_timeline_entry',
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', 'pub_date', 'post'),
+                name='timeline_user_pub_date_idx',
+            ),
+        )
@@ -0,0 +1,208 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from core.db_routers import read_alias
+
+from .constants import PAGE_CACHE_TIMEOUT
+from .models import Post
+
+SITE_SCOPE = 'site'
+PAGE_PARAMS = ('page', 'cursor')
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def _generation_key(scope):
+    return f'feed-generation:{scope}'
+
+
+def page_generations(scopes):
+    """Текущие поколения областей ленты. Поколение — время последнего
+    изменения области в мс; отсутствующее заводится текущим временем."""
+    keys = [_generation_key(scope) for scope in scopes]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            generations[key] = _now_ms()
+            cache.add(key, generations[key], None)
+
+    return [generations[key] for key in keys]
+
+
+def bump_page_generations(*scopes):
+    """Сбрасывает закэшированные страницы указанных областей ленты."""
+    keys = [_generation_key(scope) for scope in scopes]
+    current = cache.get_many(keys)
+    now = _now_ms()
+    cache.set_many(
+        {key: max(now, current.get(key, 0) + 1) for key in keys}, None)
+
+
+def local_cache_warning():
+    """Предупреждение для команд manage.py, сбрасывающих ленты: с
+    LocMemCache сброс пропадает вместе с процессом команды, и работающие
+    серверы его не видят. Пустая строка - кэш общий."""
+    if not isinstance(caches['default'], LocMemCache):
+        return ''
+
+    return (
+        'Кэш default локальный (LocMemCache): запущенные серверы не '
+        'увидят сброса лент и чисел постов до истечения кэша. Нужен '
+        'общий кэш, как в yatube.settings_production.'
+    )
+
+
+def _replica_may_lag(generations):
+    """Страница прочитана с реплики, а область менялась меньше
+    REPLICA_STICKY_SECONDS назад: реплика могла не догнать изменение,
+    и такую страницу нельзя кэшировать до следующего поколения."""
+    if read_alias.get() is None:
+        return False
+
+    return _now_ms() - max(generations) < (
+        settings.REPLICA_STICKY_SECONDS * 1000)
+
+
+def _user_parts(request):
+    """Части ETag, зависящие от пользователя. Страница авторизованного
+    содержит CSRF-токен (формы подписки), а он меняется при входе без
+    смены pk: со старой копией браузер отправлял бы формы с устаревшим
+    токеном и получал 403. Берём значение cookie - оно, в отличие
+    от get_token(), не меняется от запроса к запросу."""
+    if not request.user.is_authenticated:
+        return ('',)
+    get_token(request)
+
+    return request.user.pk, request.META['CSRF_COOKIE']
+
+
+def _checked_last_modified(request, last_modified):
+    """Last-Modified для проверки If-Modified-Since: авторизованным
+    только ETag, дата не учитывает смену CSRF-токена."""
+    return None if request.user.is_authenticated else last_modified
+
+
+def _etag(*parts):
+    raw = '|'.join(str(part) for part in parts)
+
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def _set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ('Cookie',))
+
+
+def cache_feed_page(scope, kwarg=None):
+    """Кэширует страницу ленты для анонимных пользователей.
+
+    Ключ страницы: путь, номер страницы и поколения области scope
+    (scope:<значение kwarg>, если kwarg задан) и всего сайта.
+    Страница, прочитанная с реплики сразу после изменения области,
+    не кэшируется: реплика могла отставать.
+    Поколения и страницы хранятся в кэше default: сброс виден всем
+    процессам, только если кэш общий (FileBasedCache в production,
+    memcached/redis); с LocMemCache - лишь процессу, сохранившему пост.
+    На условные GET-запросы отвечает 304, не вызывая view, в том числе
+    авторизованным пользователям - по ETag с их CSRF-токеном.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            view_scope = scope if kwarg is None else (
+                f'{scope}:{kwargs[kwarg]}')
+            generations = page_generations((SITE_SCOPE, view_scope))
+            etag = _etag(
+                request.path,
+                *(request.GET.get(param, '') for param in PAGE_PARAMS),
+                *generations,
+                *_user_parts(request),
+            )
+            last_modified = max(generations) // 1000
+            response = get_conditional_response(
+                request, etag=etag,
+                last_modified=_checked_last_modified(request, last_modified))
+            if response is not None:
+                _set_validators(response, etag, last_modified)
+                return response
+
+            if request.user.is_authenticated:
+                response = view(request, *args, **kwargs)
+            else:
+                page_key = f'feed-page:{etag}'
+                cached = cache.get(page_key)
+                if cached is not None:
+                    response = HttpResponse(
+                        cached['content'],
+                        content_type=cached['content_type'],
+                    )
+                else:
+                    response = view(request, *args, **kwargs)
+                    if (response.status_code == 200
+                            and not response.streaming
+                            and not _replica_may_lag(generations)):
+                        cache.set(page_key, {
+                            'content': response.content,
+                            'content_type': response['Content-Type'],
+                        }, PAGE_CACHE_TIMEOUT)
+            if response.status_code == 200:
+                _set_validators(response, etag, last_modified)
+
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def condition_on_post(view):
+    """Условный GET для страницы поста.
+
+    Свежесть страницы: updated_at поста и поколения его автора,
+    группы и сайта (имя автора, число его постов, название группы).
+    Проверка стоит один запрос по первичному ключу.
+    """
+    @wraps(view)
+    def wrapper(request, post_id, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, post_id, *args, **kwargs)
+        row = Post.objects.filter(pk=post_id).values_list(
+            'updated_at', 'author__username', 'group__slug').first()
+        if row is None:
+            return view(request, post_id, *args, **kwargs)
+        updated_at, username, slug = row
+        scopes = [SITE_SCOPE, f'author:{username}']
+        if slug:
+            scopes.append(f'group:{slug}')
+        generations = page_generations(scopes)
+        etag = _etag(
+            post_id, updated_at.isoformat(), *generations,
+            *_user_parts(request),
+        )
+        last_modified = max(
+            int(updated_at.timestamp()), max(generations) // 1000)
+        response = get_conditional_response(
+            request, etag=etag,
+            last_modified=_checked_last_modified(request, last_modified))
+        if response is None:
+            response = view(request, post_id, *args, **kwargs)
+        if response.status_code in (200, 304):
+            _set_validators(response, etag, last_modified)
+
+        return response
+
+    return wrapper
@@ -0,0 +1,106 @@
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+SNIPPET_TOKENS = 24
+# служебные символы вокруг найденных слов: текст экранируется целиком,
+# и только потом они заменяются на <mark>
+MARK_START, MARK_END = '\x02', '\x03'
+WORD_RE = re.compile(r'\w+')
+
+
+def fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_match(query):
+    """Поисковая строка пользователя -> выражение MATCH для FTS5.
+    Каждое слово ищется по префиксу, все слова обязательны."""
+    words = WORD_RE.findall(query or '')
+
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def highlight(snippet):
+    """Экранирует фрагмент и подсвечивает в нём найденные слова."""
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+def matching_ids(match):
+    """Подзапрос id постов, подходящих под выражение MATCH."""
+    return RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (match,),
+    )
+
+
+class SearchResults:
+    """Результаты поиска, отсортированные по релевантности (bm25).
+
+    Поддерживает count() и срезы, поэтому подходит для Paginator:
+    каждая страница - один запрос к индексу и один за постами.
+    У найденных постов есть атрибут snippet с подсвеченным фрагментом.
+    """
+
+    def __init__(self, query):
+        self.match = build_match(query)
+
+    def count(self):
+        if not self.match:
+            return 0
+        if not fts_available():
+            return self._fallback().count()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s',
+                (self.match,),
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if not self.match or stop is not None and stop <= start:
+            return []
+        if not fts_available():
+            return list(self._fallback()[start:stop])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, snippet({FTS_TABLE}, 0, %s, %s, %s, %s) '
+                f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY rank LIMIT %s OFFSET %s',
+                (MARK_START, MARK_END, '…', SNIPPET_TOKENS, self.match,
+                 -1 if stop is None else stop - start, start),
+            )
+            rows = cursor.fetchall()
+        posts = Post.objects.feed().in_bulk([post_id for post_id, _ in rows])
+        results = []
+        for post_id, snippet in rows:
+            post = posts.get(post_id)
+            if post is not None:
+                post.snippet = highlight(snippet)
+                results.append(post)
+
+        return results
+
+    def _fallback(self):
+        posts = Post.objects.feed()
+        for word in WORD_RE.findall(self.match):
+            posts = posts.filter(text__icontains=word)
+
+        return posts
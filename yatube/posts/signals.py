@@ -0,0 +1,196 @@
+from django.db.models import DEFERRED, F
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete, pre_save,
+)
+from django.dispatch import receiver
+
+from .models import AuthorPostsCounter, Group, Post, Subscription, User
+from .page_cache import SITE_SCOPE, bump_page_generations
+from .tasks import fan_out_post
+from .thumbnails import schedule_thumbnails
+from .timeline import backfill, unfollow
+from .utils import evict_post_cards, shift_post_counts
+
+
+def change_group_count(group_id, delta):
+    """Сдвигает счётчик постов группы на delta."""
+    if group_id is None:
+        return
+    groups = Group.objects.filter(pk=group_id)
+    if delta < 0:
+        groups = groups.filter(posts_count__gte=-delta)
+    groups.update(posts_count=F('posts_count') + delta)
+
+
+def change_author_count(author_id, delta):
+    """Сдвигает счётчик постов автора на delta.
+    Отсутствующий счётчик создаётся по фактическому числу постов."""
+    counters = AuthorPostsCounter.objects.filter(author_id=author_id)
+    if delta < 0:
+        counters = counters.filter(posts_count__gte=-delta)
+    updated = counters.update(posts_count=F('posts_count') + delta)
+    if not updated and delta > 0:
+        AuthorPostsCounter.objects.get_or_create(
+            author_id=author_id,
+            defaults={
+                'posts_count': Post.objects.filter(
+                    author_id=author_id).count(),
+            },
+        )
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    """Запоминаем группу и картинку поста, чтобы заметить их смену
+    при сохранении."""
+    instance._loaded_group_id = instance.__dict__.get('group_id', DEFERRED)
+    image = instance.__dict__.get('image', DEFERRED)
+    instance._loaded_image = getattr(image, 'name', image)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous(sender, instance, **kwargs):
+    """Снимок сохранённых группы и картинки на это сохранение.
+    Обработчики post_save читают _previous_*, а _loaded_* обновляет
+    remember_saved, поэтому порядок обработчиков не важен."""
+    instance._previous_group_id = instance._loaded_group_id
+    instance._previous_image = instance._loaded_image
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        change_author_count(instance.author_id, 1)
+        change_group_count(instance.group_id, 1)
+        shift_post_counts(1, instance.author_id, instance.group_id)
+    elif instance._previous_group_id not in (DEFERRED, instance.group_id):
+        change_group_count(instance._previous_group_id, -1)
+        change_group_count(instance.group_id, 1)
+        shift_post_counts(-1, group_id=instance._previous_group_id)
+        shift_post_counts(1, group_id=instance.group_id)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    change_author_count(instance.author_id, -1)
+    change_group_count(instance.group_id, -1)
+    shift_post_counts(-1, instance.author_id, instance.group_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def evict_post_card(sender, instance, raw=False, created=False, **kwargs):
+    # у нового поста ещё нет карточек в кэше
+    if not (raw or created):
+        evict_post_cards([instance])
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def evict_group_cards(sender, instance, raw=False, **kwargs):
+    if not raw:
+        evict_post_cards(instance.posts.values_list('id', 'updated_at'))
+
+
+@receiver(post_save, sender=User)
+def evict_author_cards(sender, instance, raw=False, created=False,
+                       update_fields=None, **kwargs):
+    # вход пользователя сохраняет только last_login, карточки не меняются
+    if raw or created or update_fields == frozenset(['last_login']):
+        return
+    evict_post_cards(instance.posts.values_list('id', 'updated_at'))
+
+
+def _group_scopes(*group_ids):
+    group_ids = [pk for pk in group_ids if pk not in (None, DEFERRED)]
+    slugs = Group.objects.filter(pk__in=group_ids).values_list(
+        'slug', flat=True)
+
+    return [f'group:{slug}' for slug in slugs]
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_post_pages(sender, instance, signal, raw=False, **kwargs):
+    """Новый, изменённый или удалённый пост сбрасывает главную,
+    страницы своего автора и своих групп (старой и новой)."""
+    if raw:
+        return
+    previous = DEFERRED
+    if signal is post_save:
+        previous = instance._previous_group_id
+    bump_page_generations(
+        'home',
+        f'author:{instance.author.username}',
+        *_group_scopes(instance.group_id, previous),
+    )
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+@receiver(post_save, sender=User)
+def bump_site_pages(sender, instance, raw=False, created=False,
+                    update_fields=None, **kwargs):
+    """Группа и имя автора видны на всех лентах: сбрасываем все страницы."""
+    if raw or created or update_fields == frozenset(['last_login']):
+        return
+    bump_page_generations(SITE_SCOPE)
+
+
+@receiver(post_save, sender=Post)
+def schedule_fan_out(sender, instance, created, raw=False, **kwargs):
+    """Рассылка по лентам подписчиков - фоновая задача."""
+    if created and not raw:
+        fan_out_post.delay(post_id=instance.pk)
+
+
+@receiver(post_save, sender=Subscription)
+def backfill_subscription(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        backfill(instance)
+
+
+@receiver(post_delete, sender=Subscription)
+def unfollow_subscription(sender, instance, **kwargs):
+    unfollow(instance)
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def bump_subscription_pages(sender, instance, raw=False, **kwargs):
+    """На странице автора или группы есть кнопка подписки: её состояние
+    не должно застревать в ответах 304."""
+    if raw:
+        return
+    if instance.author_id is not None:
+        bump_page_generations(f'author:{instance.author.username}')
+    else:
+        bump_page_generations(f'group:{instance.group.slug}')
+
+
+@receiver(pre_save, sender=Post)
+def reset_thumbnails(sender, instance, raw=False, **kwargs):
+    """Миниатюры прежней картинки не подходят новой."""
+    # до сохранения _loaded_image - ещё картинка из базы
+    if not raw and instance._loaded_image not in (
+            DEFERRED, instance.image.name):
+        instance.thumbnails = ''
+
+
+@receiver(post_save, sender=Post)
+def build_thumbnails(sender, instance, created, raw=False, **kwargs):
+    """Миниатюры новой картинки строятся в фоне, не в запросе."""
+    if raw:
+        return
+    if created or instance._previous_image not in (
+            DEFERRED, instance.image.name):
+        schedule_thumbnails(instance)
+
+
+@receiver(post_save, sender=Post)
+def remember_saved(sender, instance, **kwargs):
+    """Сохранённые группа и картинка - теперь те, что в базе."""
+    instance._loaded_group_id = instance.group_id
+    instance._loaded_image = instance.image.name
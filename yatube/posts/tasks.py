@@ -0,0 +1,14 @@
+from tasks.queue import task
+
+from .models import Post
+from .timeline import fan_out
+
+
+@task()
+def fan_out_post(post_id):
+    """Рассылает новый пост по лентам подписчиков."""
+    post = Post.objects.filter(pk=post_id).only(
+        'id', 'author_id', 'group_id', 'pub_date').first()
+    # пост успели удалить - рассылать нечего
+    if post is not None:
+        fan_out(post)
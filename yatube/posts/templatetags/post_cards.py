@@ -0,0 +1,11 @@
+from django import template
+
+from posts.constants import POST_CARD_TIMEOUT
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card_timeout():
+    """Время жизни карточки поста для {% cache %}."""
+    return POST_CARD_TIMEOUT
@@ -0,0 +1,24 @@
+from django import template
+
+from posts.thumbnails import load_thumbnails
+
+register = template.Library()
+
+# ширина картинки в вёрстке: колонка контейнера или весь экран
+IMAGE_SIZES = '(min-width: 992px) 720px, 100vw'
+
+
+@register.inclusion_tag('posts/includes/post_image.html')
+def post_image(post, lazy=True, sizes=IMAGE_SIZES):
+    """Картинка поста с srcset из готовых миниатюр. Пока миниатюр
+    нет, выводится оригинал: в запросе они не строятся."""
+    thumbnails = load_thumbnails(post.thumbnails)
+
+    return {
+        'post': post,
+        'largest': thumbnails[-1] if thumbnails else None,
+        'srcset': ', '.join(
+            f'{url} {width}w' for url, width, _ in thumbnails),
+        'sizes': sizes,
+        'lazy': lazy,
+    }
@@ -0,0 +1,217 @@
+import json
+import os
+import tempfile
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.export import export_rows
+from posts.models import AuthorPostsCounter, Group, Post, Subscription
+from posts.utils import count_cache_key
+
+
+User = get_user_model()
+
+
+class TestCheckQueryPlans(TestCase):
+    """Проверяем, что запросы лент используют индексы."""
+
+    def test_feed_queries_use_indexes(self):
+        """Ни один запрос ленты не сортируется во временном B-дереве."""
+        out = StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertNotIn('FAIL', out.getvalue())
+        self.assertIn('post_pub_date_id_idx', out.getvalue())
+
+
+class TestRecountPosts(TestCase):
+    """Проверяем пересчёт счётчиков постов."""
+
+    def test_recount_repairs_drift(self):
+        """Счётчики, разошедшиеся после bulk_create, исправляются."""
+        user = User.objects.create_user(username='Artem')
+        group = Group.objects.create(
+            title='Test title',
+            slug='TestSlug',
+            description='Test description',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Текст {i}', author=user, group=group)
+            for i in range(3)
+        )
+        call_command('recount_posts', stdout=StringIO())
+        group.refresh_from_db()
+        self.assertEqual(group.posts_count, 3)
+        self.assertEqual(
+            AuthorPostsCounter.objects.get(author=user).posts_count, 3)
+
+
+class TestImportPosts(TestCase):
+    """Проверяем пакетный импорт постов."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Artem')
+        cls.group = Group.objects.create(
+            title='Test title',
+            slug='TestSlug',
+            description='Test description',
+        )
+
+    def import_file(self, suffix, content, *args):
+        with tempfile.NamedTemporaryFile(
+                'w', suffix=suffix, encoding='utf-8', delete=False) as file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        out, self.err = StringIO(), StringIO()
+        call_command(
+            'import_posts', file.name, *args, stdout=out, stderr=self.err)
+
+        return out.getvalue()
+
+    def test_import_jsonl(self):
+        """JSONL импортируется пачками, даты и счётчики верны."""
+        rows = [
+            {'text': f'Пост {i}', 'author': 'Artem', 'group': 'TestSlug',
+             'pub_date': f'2020-01-0{i + 1}T10:00:00+00:00'}
+            for i in range(5)
+        ]
+        rows += [
+            {'text': 'Чужой пост', 'author': 'nobody'},
+            {'text': 'Пост в никуда', 'author': 'Artem', 'group': 'nope'},
+            ['не', 'объект'],
+            42,
+        ]
+        out = self.import_file(
+            '.jsonl', '\n'.join(json.dumps(row) for row in rows),
+            '--batch-size', '2')
+        self.assertIn('Готово: 5 постов, пропущено 4', out)
+        self.assertEqual(self.group.posts.count(), 5)
+        self.assertEqual(
+            Post.objects.earliest('pub_date').pub_date.isoformat(),
+            '2020-01-01T10:00:00+00:00')
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 5)
+        self.assertEqual(self.user.posts_counter.posts_count, 5)
+
+    def test_import_skips_malformed_fields(self):
+        """Поля не тех типов и несуществующие даты пропускаются,
+        а не обрывают импорт."""
+        rows = [
+            {'text': 'Тридцатое февраля', 'author': 'Artem',
+             'pub_date': '2020-02-30T00:00:00'},
+            {'text': 'Дата числом', 'author': 'Artem', 'pub_date': 12345},
+            {'text': 'Автор списком', 'author': ['a']},
+            {'text': 'Хороший пост', 'author': 'Artem'},
+        ]
+        out = self.import_file(
+            '.jsonl', '\n'.join(json.dumps(row) for row in rows))
+        self.assertIn('Готово: 1 постов, пропущено 3', out)
+        self.assertTrue(Post.objects.filter(text='Хороший пост').exists())
+
+    def test_import_csv_creates_authors(self):
+        """CSV импортируется, новые авторы создаются по флагу."""
+        content = 'text,author,group,pub_date\nПривет,Newbie,,\n'
+        self.import_file('.csv', content, '--create-authors')
+        post = Post.objects.get(text='Привет')
+        self.assertEqual(post.author.username, 'Newbie')
+        self.assertIsNone(post.group)
+        self.assertFalse(post.author.has_usable_password())
+
+    def test_import_updates_feeds(self):
+        """Импорт, минуя сигналы, обновляет числа постов лент в кэше
+        и ленту подписок."""
+        cache.clear()
+        reader = User.objects.create_user(username='Reader')
+        Subscription.objects.create(user=reader, author=self.user)
+        self.client.get(reverse('posts:home'))
+        key = count_cache_key(Post.objects.all())
+        self.assertEqual(cache.get(key), 0)
+        self.import_file(
+            '.jsonl', json.dumps({'text': 'Импорт', 'author': 'Artem'}))
+        self.assertEqual(cache.get(key), 1)
+        # тесты идут на LocMemCache: команда предупреждает, что
+        # серверы в других процессах сброса не увидят
+        self.assertIn('LocMemCache', self.err.getvalue())
+        self.client.force_login(reader)
+        self.assertContains(
+            self.client.get(reverse('posts:follow_index')), 'Импорт')
+
+
+class TestExportPosts(TestCase):
+    """Проверяем потоковую выгрузку постов."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Artem')
+        cls.group = Group.objects.create(
+            title='Test title',
+            slug='TestSlug',
+            description='Test description',
+        )
+        Post.objects.create(text='В группе', author=cls.user, group=cls.group)
+        Post.objects.create(text='Без группы', author=cls.user)
+
+    def test_export_jsonl_with_filter(self):
+        """JSONL содержит автора и группу, фильтр по группе работает."""
+        out = StringIO()
+        call_command('export_posts', '--group', 'TestSlug', stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['text'], 'В группе')
+        self.assertEqual(rows[0]['author'], 'Artem')
+        self.assertEqual(rows[0]['group'], 'TestSlug')
+
+    def test_export_date_bounds(self):
+        """since/until включают весь день и сравнивают pub_date
+        с границами дней, без функции над столбцом."""
+        for text, pub_date in (
+                ('В группе', '2020-01-01T23:59:59+00:00'),
+                ('Без группы', '2020-01-02T00:00:00+00:00')):
+            Post.objects.filter(text=text).update(pub_date=pub_date)
+        with CaptureQueriesContext(connection) as captured:
+            rows = list(export_rows(since='2020-01-02', until='2020-01-02'))
+        self.assertEqual([row[1] for row in rows], ['Без группы'])
+        self.assertNotIn('cast_date', captured[0]['sql'])
+        rows = list(export_rows(until='2020-01-01'))
+        self.assertEqual([row[1] for row in rows], ['В группе'])
+
+    def test_export_view_is_streaming_and_staff_only(self):
+        """Выгрузка доступна только сотрудникам и отдаётся потоком."""
+        url = reverse('posts:export')
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, HTTPStatus.FOUND)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(url, {'format': 'csv', 'since': 'x'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        response = self.client.get(url, {'format': 'csv'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,text,pub_date,author,group')
+        self.assertEqual(len(lines), 3)
+
+
+class TestSeedPosts(TestCase):
+    """Проверяем заполнение базы для бенчмарков."""
+
+    def test_seed_creates_objects_and_counters(self):
+        call_command(
+            'seed_posts', users=5, groups=2, posts=50, batch_size=20,
+            seed=1, password='x', stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(Group.objects.count(), 2)
+        self.assertEqual(Post.objects.count(), 50)
+        self.assertTrue(User.objects.first().check_password('x'))
+        self.assertEqual(
+            sum(Group.objects.values_list('posts_count', flat=True)),
+            Post.objects.exclude(group=None).count())
@@ -48,3 +48,45 @@ class PostModelTest(TestCase):
             with self.subTest(field=field):
                 self.assertEqual(
                     post._meta.get_field(field).verbose_name, expected_value)
+
+
+class PostCountersTest(TestCase):
+    """Счётчики постов автора и группы следуют за постами."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='TestGroupTitle',
+            slug='TestSlug',
+            description='TestDescription',
+        )
+        cls.other_group = Group.objects.create(
+            title='OtherGroupTitle',
+            slug='OtherSlug',
+            description='OtherDescription',
+        )
+
+    def assertCounts(self, author_count, group_count, other_group_count):
+        self.user.posts_counter.refresh_from_db()
+        self.group.refresh_from_db()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.user.posts_counter.posts_count, author_count)
+        self.assertEqual(self.group.posts_count, group_count)
+        self.assertEqual(self.other_group.posts_count, other_group_count)
+
+    def test_counters_follow_posts(self):
+        """Создание, смена группы и удаление поста меняют счётчики."""
+        post = Post.objects.create(
+            text='Текст', author=self.user, group=self.group)
+        Post.objects.create(text='Текст', author=self.user)
+        self.assertCounts(2, 1, 0)
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.other_group
+        post.save()
+        self.assertCounts(2, 0, 1)
+        post.save()
+        self.assertCounts(2, 0, 1)
+        post.delete()
+        self.assertCounts(1, 0, 0)
@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts.models import Post
+from posts.constants import NUM_PAGE
+
+
+User = get_user_model()
+
+
+class TestSearch(TestCase):
+    """Проверяем полнотекстовый поиск по постам."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Artem')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Кошки <b>любят</b> спать на солнце')
+        Post.objects.create(author=cls.author, text='Собаки любят гулять')
+        cls.url = reverse('posts:search')
+
+    def search(self, query, **params):
+        return self.client.get(self.url, {'q': query, **params})
+
+    def test_search_finds_and_highlights(self):
+        """Поиск находит пост и подсвечивает слово, экранируя HTML."""
+        response = self.search('кошк')
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, 1)
+        self.assertEqual(page_obj[0].id, self.post.id)
+        self.assertContains(response, '<mark>Кошки</mark>')
+        self.assertContains(response, '&lt;b&gt;любят&lt;/b&gt;')
+
+    def test_search_requires_all_words(self):
+        """Все слова запроса обязательны, спецсимволы не ломают поиск."""
+        self.assertEqual(
+            self.search('любят').context['page_obj'].paginator.count, 2)
+        self.assertEqual(
+            self.search('любят собаки"').context[
+                'page_obj'].paginator.count, 1)
+        self.assertEqual(
+            self.search('').context['page_obj'].paginator.count, 0)
+
+    def test_index_follows_posts(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        post = Post.objects.create(author=self.author, text='Редкое слово')
+        self.assertEqual(
+            self.search('редкое').context['page_obj'].paginator.count, 1)
+        post.text = 'Другой текст'
+        post.save()
+        self.assertEqual(
+            self.search('редкое').context['page_obj'].paginator.count, 0)
+        post.delete()
+        self.assertEqual(
+            self.search('другой').context['page_obj'].paginator.count, 0)
+
+    def test_search_pagination_keeps_query(self):
+        """Ссылки паджинатора сохраняют поисковый запрос."""
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Пост про котов {i}')
+            for i in range(NUM_PAGE + 1)
+        )
+        response = self.search('котов')
+        self.assertContains(
+            response, '?q=%D0%BA%D0%BE%D1%82%D0%BE%D0%B2&amp;page=2')
+        response = self.search('котов', page=2)
+        self.assertEqual(len(response.context['page_obj']), 1)
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке работает через тот же индекс."""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'собак'})
+        self.assertEqual(response.context['cl'].result_count, 1)
@@ -0,0 +1,138 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from core.tests.cases import ResetSequencesTestCase
+from posts.models import Post
+from posts.thumbnails import _generate_for_post, load_thumbnails
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(name='photo.png', size=(1200, 600)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'teal').save(buffer, 'PNG')
+
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class TestPostThumbnails(TestCase):
+    """Проверяем картинки постов и их миниатюры."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Artem')
+        cls.client_author = Client()
+        cls.client_author.force_login(cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        caches['thumbnails'].clear()
+
+    def test_feed_does_not_generate_thumbnails(self):
+        """Лента выводит оригинал и не строит миниатюры в запросе."""
+        response = self.client_author.post(
+            reverse('posts:post_create'),
+            {'text': 'С картинкой', 'image': make_image()},
+        )
+        self.assertEqual(response.status_code, 302)
+        post = Post.objects.get()
+        self.assertTrue(post.image.name.startswith('posts/'))
+
+        with CaptureQueriesContext(connection) as queries:
+            content = self.client.get(reverse('posts:home')).content.decode()
+        self.assertIn(post.image.url, content)
+        self.assertIn('loading="lazy"', content)
+        self.assertNotIn('srcset', content)
+        self.assertFalse(any(
+            'thumbnail_kvstore' in query['sql']
+            for query in queries.captured_queries
+        ))
+        self.assertEqual(post.thumbnails, '')
+
+    def test_generated_thumbnails_in_srcset(self):
+        """После построения миниатюр карточка выводит srcset."""
+        post = Post.objects.create(
+            author=self.user, text='С картинкой', image=make_image())
+        self.client.get(reverse('posts:home'))
+        _generate_for_post(post.id, post.image.name)
+
+        post.refresh_from_db()
+        thumbnails = load_thumbnails(post.thumbnails)
+        self.assertEqual(
+            [(width, height) for _, width, height in thumbnails],
+            [(320, 160), (640, 320), (960, 480)],
+        )
+        content = self.client.get(reverse('posts:home')).content.decode()
+        for url, width, _ in thumbnails:
+            self.assertIn(f'{url} {width}w', content)
+        detail = self.client.get(
+            reverse('posts:post_detail', args=(post.id,))).content.decode()
+        self.assertIn('srcset', detail)
+        self.assertNotIn('loading="lazy"', detail)
+
+    def test_small_image_not_upscaled(self):
+        """Картинка уже самой узкой миниатюры даёт один вариант."""
+        post = Post.objects.create(
+            author=self.user, text='Маленькая',
+            image=make_image('small.png', (200, 100)))
+        _generate_for_post(post.id, post.image.name)
+
+        post.refresh_from_db()
+        thumbnails = load_thumbnails(post.thumbnails)
+        self.assertEqual([width for _, width, _ in thumbnails], [200])
+
+    @mock.patch('posts.signals.schedule_thumbnails')
+    def test_scheduled_only_for_new_image(self, schedule):
+        """Миниатюры ставятся в очередь для новой картинки,
+        но не при правке одного текста."""
+        post = Post.objects.create(
+            author=self.user, text='С картинкой', image=make_image())
+        self.assertEqual(schedule.call_count, 1)
+        post = Post.objects.get(pk=post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(schedule.call_count, 1)
+        post.thumbnails = 'posts/old.png 320 160'
+        post.image = make_image('other.png')
+        post.save()
+        self.assertEqual(schedule.call_count, 2)
+        self.assertEqual(post.thumbnails, '')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class TestThumbnailsOnCommit(ResetSequencesTestCase):
+    """Миниатюры строятся после фиксации транзакции."""
+
+    def tearDown(self):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        caches['thumbnails'].clear()
+        super().tearDown()
+
+    def test_thumbnails_after_commit(self):
+        user = User.objects.create_user(username='Artem')
+        post = Post.objects.create(
+            author=user, text='С картинкой', image=make_image())
+
+        post.refresh_from_db()
+        self.assertEqual(len(load_thumbnails(post.thumbnails)), 3)
@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts.models import Group, Post, Subscription, TimelineEntry
+
+
+User = get_user_model()
+
+
+class TestTimeline(TestCase):
+    """Проверяем ленту подписок (рассылка при публикации)."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Artem')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание')
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.old_post = Post.objects.create(
+            author=self.author, text='Старый пост')
+
+    def follow_author(self):
+        self.reader_client.post(reverse(
+            'posts:profile_follow', kwargs={'username': 'Artem'}))
+
+    def feed(self):
+        response = self.reader_client.get(reverse('posts:follow_index'))
+
+        return [post.text for post in response.context['page_obj']]
+
+    def test_follow_backfills_and_new_posts_fan_out(self):
+        """Подписка подтягивает старые посты, новые рассылаются."""
+        self.assertEqual(self.feed(), [])
+        self.follow_author()
+        self.assertEqual(self.feed(), ['Старый пост'])
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(self.feed(), ['Новый пост', 'Старый пост'])
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 2)
+
+    def test_unfollow_keeps_posts_from_other_subscriptions(self):
+        """Отписка убирает посты автора, кроме постов из групп подписки."""
+        self.follow_author()
+        Post.objects.create(
+            author=self.author, text='Пост в группе', group=self.group)
+        self.reader_client.post(reverse(
+            'posts:group_follow', kwargs={'slug': 'test_slug'}))
+        self.reader_client.post(reverse(
+            'posts:profile_unfollow', kwargs={'username': 'Artem'}))
+        self.assertEqual(self.feed(), ['Пост в группе'])
+        self.assertFalse(Subscription.objects.filter(
+            user=self.reader, author=self.author).exists())
+
+    @mock.patch('posts.timeline.TIMELINE_SIZE', 2)
+    def test_timeline_is_capped(self):
+        """В ленте хранится не больше TIMELINE_SIZE записей."""
+        self.follow_author()
+        for i in range(3):
+            Post.objects.create(author=self.author, text=f'Пост {i}')
+        self.assertEqual(self.feed(), ['Пост 2', 'Пост 1'])
+
+    @mock.patch('posts.timeline.CELEBRITY_FOLLOWERS', 0)
+    def test_celebrity_posts_are_read_on_demand(self):
+        """Посты знаменитости не рассылаются, но попадают в ленту."""
+        self.follow_author()
+        cache.clear()
+        Post.objects.create(author=self.author, text='Пост знаменитости')
+        self.assertFalse(TimelineEntry.objects.filter(
+            post__text='Пост знаменитости').exists())
+        self.assertEqual(self.feed(), ['Пост знаменитости', 'Старый пост'])
+
+    def test_cannot_follow_yourself(self):
+        """На себя подписаться нельзя."""
+        client = Client()
+        client.force_login(self.author)
+        client.post(reverse(
+            'posts:profile_follow', kwargs={'username': 'Artem'}))
+        self.assertFalse(Subscription.objects.exists())
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase, Client
 from http import HTTPStatus
 
@@ -26,6 +27,7 @@ class GuestURLTest(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.autorized_user = Client()
         self.autorized_user.force_login(self.user)
         self.not_author = Client()
@@ -0,0 +1,159 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, override_settings,
+)
+from django.db import connection
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.utils import (
+    CachedCountPaginator, cursor_paginator, decode_cursor, encode_cursor,
+    page_window, paginator,
+)
+from posts.constants import NUM_PAGE, TEST_PAGE_2
+
+
+User = get_user_model()
+
+
+class TestCursorPaginator(TestCase):
+    """Проверяем постраничный вывод по курсору."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Artem')
+        Post.objects.bulk_create(
+            Post(author=cls.author, text=f'Тестовый пост {i}')
+            for i in range(NUM_PAGE + TEST_PAGE_2)
+        )
+        cls.factory = RequestFactory()
+
+    def setUp(self):
+        cache.clear()
+
+    def get_page(self, cursor=None):
+        data = {'cursor': cursor} if cursor else {}
+        request = self.factory.get('/', data)
+
+        return cursor_paginator(request, Post.objects.all())
+
+    def test_cursor_round_trip(self):
+        """Токен курсора обратимо кодирует пост."""
+        post = Post.objects.first()
+        pub_date, post_id, reverse = decode_cursor(encode_cursor(post, True))
+        self.assertEqual(pub_date, post.pub_date)
+        self.assertEqual(post_id, post.id)
+        self.assertTrue(reverse)
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+
+    def test_next_and_previous_pages(self):
+        """Переход вперёд и назад возвращает те же посты."""
+        first = self.get_page()
+        self.assertEqual(len(first), NUM_PAGE)
+        self.assertFalse(first.has_previous())
+        second = self.get_page(first.next_cursor)
+        self.assertEqual(len(second), TEST_PAGE_2)
+        self.assertFalse(second.has_next())
+        self.assertTrue(second.has_previous())
+        self.assertFalse(set(first) & set(second))
+        back = self.get_page(second.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+
+    def test_cursor_page_order(self):
+        """Посты на страницах идут от новых к старым без пропусков."""
+        first = self.get_page()
+        second = self.get_page(first.next_cursor)
+        expected = list(Post.objects.order_by('-pub_date', '-id'))
+        self.assertEqual(list(first) + list(second), expected)
+
+    @override_settings(POSTS_CURSOR_PAGINATION=True)
+    def test_cursor_mode_in_views(self):
+        """В режиме курсора лента выводит ссылки ?cursor=."""
+        response = self.client.get(reverse('posts:home'))
+        page_obj = response.context['page_obj']
+        self.assertTrue(page_obj.is_cursor)
+        self.assertContains(response, f'?cursor={page_obj.next_cursor}')
+        self.assertNotContains(response, '?page=')
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'Artem'}),
+            {'cursor': page_obj.next_cursor},
+        )
+        self.assertEqual(len(response.context['page_obj']), TEST_PAGE_2)
+
+
+class TestPageWindow(SimpleTestCase):
+    """Проверяем окно номеров страниц в навигации."""
+
+    def test_window(self):
+        self.assertEqual(page_window(1, 1), [1])
+        self.assertEqual(page_window(1, 5), [1, 2, 3, 4, 5])
+        self.assertEqual(page_window(1, 100), [1, 2, 3, None, 100])
+        self.assertEqual(
+            page_window(50, 100), [1, None, 48, 49, 50, 51, 52, None, 100])
+        # пропуск в одну страницу показывается номером, а не многоточием
+        self.assertEqual(page_window(5, 100)[:3], [1, 2, 3])
+        self.assertEqual(page_window(100, 100), [1, None, 98, 99, 100])
+
+    def test_page_links_are_bounded(self):
+        """Ссылок столько же при любом числе страниц."""
+        request = RequestFactory().get('/', {'page': 500})
+        page_obj = paginator(request, range(NUM_PAGE * 1000), cursor=False)
+        self.assertEqual(
+            page_obj.page_window,
+            [1, None, 498, 499, 500, 501, 502, None, 1000])
+
+
+class TestCachedCountPaginator(TestCase):
+    """Проверяем закэшированное число постов в паджинаторе."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='Artem')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        Post.objects.bulk_create(
+            Post(author=cls.author, text=f'Тестовый пост {i}')
+            for i in range(3)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def count(self, posts):
+        return CachedCountPaginator(posts, NUM_PAGE).count
+
+    def test_count_is_cached_and_shifted(self):
+        """COUNT выполняется один раз, новые и удалённые посты
+        сдвигают закэшированные числа лент."""
+        self.assertEqual(self.count(Post.objects.feed()), 3)
+        self.assertEqual(self.count(self.group.posts.feed()), 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.count(Post.objects.feed()), 3)
+        post = Post.objects.create(
+            author=self.author, text='Новый', group=self.group)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.count(Post.objects.feed()), 4)
+            self.assertEqual(self.count(self.group.posts.feed()), 1)
+        post.group = None
+        post.save()
+        self.assertEqual(self.count(self.group.posts.feed()), 0)
+        post.delete()
+        self.assertEqual(self.count(self.author.posts.feed()), 3)
+
+    @override_settings(POSTS_COUNT_ESTIMATE_THRESHOLD=1)
+    def test_estimate_for_large_table(self):
+        """Выше порога число всей ленты берётся из sqlite_stat1."""
+        self.assertEqual(self.count(Post.objects.feed()), 3)
+        cache.clear()
+        Post.objects.bulk_create(
+            Post(author=self.author, text='Ещё') for _ in range(2))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE posts_post')
+        Post.objects.filter(text='Ещё').delete()
+        # оценка по статистике, без COUNT(*)
+        self.assertEqual(self.count(Post.objects.feed()), 5)
+        # отфильтрованные ленты считаются точно
+        self.assertEqual(self.count(self.author.posts.feed()), 3)
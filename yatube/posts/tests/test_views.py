@@ -1,11 +1,18 @@
+import time
+from http import HTTPStatus
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase, Client
 from django.urls import reverse
 from django import forms
-from django.core.cache import cache
+from django.core.cache import cache, caches
+from django.db.models.signals import post_save
 
 from posts.models import Post, Group
-from posts.constants import NUM_PAGE, TEST_PAGE_2
+from posts.constants import (
+    NUM_PAGE, POST_CARD_CACHE, POST_CARD_TIMEOUT, TEST_PAGE_2,
+)
 
 
 User = get_user_model()
@@ -32,6 +39,7 @@ class TestPostViews(TestCase):
         cls.edit = 'posts:post_edit'
 
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(username='test_user')
         self.authorized_client = Client()
         self.author_client = Client()
@@ -183,3 +191,223 @@ class TestPostViews(TestCase):
             with self.subTest(response=response):
                 self.assertEqual(len(response.context['page_obj'].object_list),
                                  TEST_PAGE_2)
+
+
+class TestPostCardCache(TestCase):
+    """Карточки постов кэшируются и сбрасываются при изменениях."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Artem')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание')
+
+    def setUp(self):
+        cache.clear()
+        caches[POST_CARD_CACHE].clear()
+        self.post = Post.objects.create(
+            author=self.author,
+            text='Исходный текст',
+            group=self.group)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_card_is_cached(self):
+        """Повторный вывод ленты берёт карточку из кэша."""
+        self.client.get(reverse('posts:home'))
+        Post.objects.filter(pk=self.post.pk).update(text='Мимо сигналов')
+        response = self.client.get(reverse('posts:home'))
+        self.assertContains(response, 'Исходный текст')
+
+    def test_card_expires(self):
+        """Карточка не вечна: через POST_CARD_TIMEOUT она строится
+        заново, даже если сброс до процесса не дошёл."""
+        self.author_client.get(reverse('posts:home'))
+        Post.objects.filter(pk=self.post.pk).update(text='Мимо сигналов')
+        later = time.time() + POST_CARD_TIMEOUT + 1
+        with mock.patch('time.time', return_value=later):
+            response = self.author_client.get(reverse('posts:home'))
+        self.assertContains(response, 'Мимо сигналов')
+
+    def test_post_edit_evicts_card(self):
+        """Редактирование поста сбрасывает его карточку."""
+        self.client.get(reverse('posts:home'))
+        self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Новый текст', 'group': self.group.pk})
+        response = self.client.get(reverse('posts:home'))
+        self.assertContains(response, 'Новый текст')
+        self.assertNotContains(response, 'Исходный текст')
+
+    def test_group_and_author_changes_evict_cards(self):
+        """Смена slug группы и имени автора сбрасывает карточки."""
+        self.client.get(reverse('posts:home'))
+        self.group.slug = 'new_slug'
+        self.group.save()
+        response = self.client.get(reverse('posts:home'))
+        self.assertContains(response, '/group/new_slug/')
+        self.author.first_name = 'Артём'
+        self.author.save()
+        response = self.client.get(reverse('posts:home'))
+        self.assertContains(response, 'Артём')
+
+
+class TestFeedPageCache(TestCase):
+    """Страницы лент кэшируются для анонимов по поколениям."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Artem')
+        cls.other = User.objects.create_user(username='Other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание')
+
+    def setUp(self):
+        cache.clear()
+        Post.objects.create(author=self.author, text='Первый пост',
+                            group=self.group)
+        self.home = reverse('posts:home')
+        self.group_url = reverse('posts:group', kwargs={'slug': 'test_slug'})
+        self.profile_url = reverse('posts:profile',
+                                   kwargs={'username': 'Artem'})
+
+    def test_page_is_cached_for_anonymous(self):
+        """Повторный запрос анонима отдаётся из кэша."""
+        self.assertIsNotNone(self.client.get(self.home).context)
+        self.assertIsNone(self.client.get(self.home).context)
+        user_client = Client()
+        user_client.force_login(self.other)
+        self.assertIsNotNone(user_client.get(self.home).context)
+
+    def test_new_post_bumps_only_affected_pages(self):
+        """Новый пост сбрасывает только свои ленты."""
+        for url in (self.home, self.group_url, self.profile_url):
+            self.client.get(url)
+        Post.objects.create(author=self.other, text='Пост без группы')
+        self.assertIsNotNone(self.client.get(self.home).context)
+        self.assertIsNone(self.client.get(self.group_url).context)
+        self.assertIsNone(self.client.get(self.profile_url).context)
+        Post.objects.create(author=self.author, text='Второй пост',
+                            group=self.group)
+        self.assertContains(self.client.get(self.group_url), 'Второй пост')
+        self.assertContains(self.client.get(self.profile_url), 'Второй пост')
+
+    def test_conditional_get(self):
+        """Запрос с If-None-Match получает 304."""
+        response = self.client.get(self.home)
+        self.assertTrue(response.has_header('Last-Modified'))
+        response = self.client.get(
+            self.home, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_group_change_bumps_old_group(self):
+        """Перенос поста в другую группу сбрасывает страницу старой."""
+        self.client.get(self.group_url)
+        post = Post.objects.get(text='Первый пост')
+        post.group = None
+        post.save()
+        response = self.client.get(self.group_url)
+        self.assertNotContains(response, 'Первый пост')
+
+    def move_to_other_group(self):
+        """Переносит пост в другую группу и проверяет страницы
+        и счётчики обеих групп."""
+        other_group = Group.objects.create(
+            title='Другая группа', slug='other_slug', description='')
+        other_url = reverse('posts:group', kwargs={'slug': 'other_slug'})
+        for url in (self.group_url, other_url):
+            self.client.get(url)
+        post = Post.objects.get(text='Первый пост')
+        old_count = Group.objects.get(pk=post.group_id).posts_count
+        post.group = other_group
+        post.save()
+        self.assertNotContains(self.client.get(self.group_url), 'Первый пост')
+        self.assertContains(self.client.get(other_url), 'Первый пост')
+        self.assertEqual(
+            Group.objects.get(slug='test_slug').posts_count, old_count - 1)
+        self.assertEqual(Group.objects.get(slug='other_slug').posts_count, 1)
+
+    def test_move_between_groups_bumps_both(self):
+        """Перенос поста между группами сбрасывает страницы и счётчики
+        обеих."""
+        self.move_to_other_group()
+
+    def test_move_between_groups_any_receiver_order(self):
+        """Итог переноса не зависит от порядка обработчиков post_save."""
+        receivers = post_save.receivers[:]
+        post_save.receivers.reverse()
+        post_save.sender_receivers_cache.clear()
+        try:
+            self.move_to_other_group()
+        finally:
+            post_save.receivers[:] = receivers
+            post_save.sender_receivers_cache.clear()
+
+
+class TestPostDetailConditional(TestCase):
+    """Условный GET страницы поста."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Artem')
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(author=self.author, text='Текст')
+        self.url = reverse('posts:post_detail',
+                           kwargs={'post_id': self.post.pk})
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_not_modified(self):
+        """Неизменённый пост отдаётся ответом 304."""
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_edit_changes_etag(self):
+        """post_edit обновляет updated_at и ETag страницы поста."""
+        etag = self.client.get(self.url)['ETag']
+        updated_at = self.post.updated_at
+        self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Новый текст'})
+        self.post.refresh_from_db()
+        self.assertGreater(self.post.updated_at, updated_at)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Новый текст')
+
+    def test_etag_changes_with_csrf_token(self):
+        """Новый CSRF-токен (повторный вход) меняет ETag: иначе браузер
+        взял бы копию со старым токеном в формах."""
+        for url in (self.url, reverse('posts:home')):
+            self.author_client.cookies['csrftoken'] = 'a' * 64
+            response = self.author_client.get(url)
+            etag = response['ETag']
+            response = self.author_client.get(
+                url, HTTP_IF_NONE_MATCH=etag,
+                HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+            self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+            self.author_client.cookies['csrftoken'] = 'b' * 64
+            response = self.author_client.get(
+                url, HTTP_IF_NONE_MATCH=etag,
+                HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_etag_depends_on_user(self):
+        """Автор видит кнопку редактирования: у него свой ETag."""
+        etag = self.client.get(self.url)['ETag']
+        response = self.author_client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
@@ -0,0 +1,119 @@
+"""Миниатюры картинок постов.
+
+Миниатюры всех ширин THUMBNAIL_WIDTHS строятся sorl-thumbnail в пуле
+потоков после фиксации транзакции, в которой сохранён пост. Готовый
+список миниатюр записывается в Post.thumbnails: лента выводит srcset
+из строки поста и не обращается ни к sorl, ни к его хранилищу ключей.
+Пока пул не дошёл до поста, карточка выводит оригинал.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from sorl.thumbnail import default
+
+from .constants import THUMBNAIL_WIDTHS
+
+logger = logging.getLogger(__name__)
+
+# миниатюра не растягивается больше оригинала
+THUMBNAIL_OPTIONS = {'upscale': False}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def generate_thumbnails(name):
+    """Строит миниатюры картинки name. Возвращает их по возрастанию
+    ширины, без повторов: у маленькой картинки варианты шире её
+    совпадают."""
+    thumbnails = {}
+    for width in THUMBNAIL_WIDTHS:
+        thumbnail = default.backend.get_thumbnail(
+            name, str(width), **THUMBNAIL_OPTIONS)
+        thumbnails.setdefault(thumbnail.width, thumbnail)
+
+    return [thumbnails[width] for width in sorted(thumbnails)]
+
+
+def dump_thumbnails(thumbnails):
+    """Миниатюры -> строки 'имя ширина высота' для Post.thumbnails."""
+    return '\n'.join(
+        f'{thumbnail.name} {thumbnail.width} {thumbnail.height}'
+        for thumbnail in thumbnails
+    )
+
+
+def load_thumbnails(value):
+    """Post.thumbnails -> [(url, ширина, высота)]; испорченные строки
+    пропускаются."""
+    thumbnails = []
+    for line in value.splitlines():
+        name, _, size = line.rpartition(' ')
+        name, _, width = name.rpartition(' ')
+        if name and width.isdigit() and size.isdigit():
+            thumbnails.append(
+                (default.storage.url(name), int(width), int(size)))
+
+    return thumbnails
+
+
+def _generate_for_post(post_id, name):
+    from .models import Post
+    from .page_cache import bump_page_generations
+    from .utils import evict_post_cards
+
+    try:
+        thumbnails = dump_thumbnails(generate_thumbnails(name))
+        post = Post.objects.select_related('author', 'group').filter(
+            pk=post_id, image=name).first()
+        # пока строились миниатюры, пост удалили или сменили картинку
+        if post is None:
+            return
+        # update не трогает updated_at и не вызывает сигналы сохранения
+        Post.objects.filter(pk=post_id, image=name).update(
+            thumbnails=thumbnails)
+        # карточки и страницы, собранные с оригиналом, пересобираются
+        evict_post_cards([post])
+        scopes = ['home', f'author:{post.author.username}']
+        if post.group is not None:
+            scopes.append(f'group:{post.group.slug}')
+        bump_page_generations(*scopes)
+    except Exception:
+        logger.exception('Не удалось построить миниатюры %s', name)
+
+
+def _generate_in_pool(post_id, name):
+    try:
+        _generate_for_post(post_id, name)
+    finally:
+        # соединения потока пула не должны копиться и устаревать
+        connections.close_all()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                settings.THUMBNAIL_WORKERS, thread_name_prefix='thumbnails')
+
+    return _executor
+
+
+def schedule_thumbnails(post):
+    """Ставит построение миниатюр поста в пул после фиксации
+    транзакции. THUMBNAIL_WORKERS = 0 - строить сразу в этом потоке."""
+    if not post.image:
+        return
+    post_id, name = post.pk, post.image.name
+
+    def submit():
+        if settings.THUMBNAIL_WORKERS:
+            _get_executor().submit(_generate_in_pool, post_id, name)
+        else:
+            _generate_for_post(post_id, name)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,133 @@
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+
+from .constants import (
+    CELEBRITIES_TIMEOUT, CELEBRITY_FOLLOWERS, TIMELINE_SIZE,
+)
+from .models import Post, Subscription, TimelineEntry
+
+CELEBRITIES_KEY = 'timeline-celebrities'
+
+
+def celebrities():
+    """Авторы и группы, у которых подписчиков больше порога.
+    Общий для записи и чтения ленты набор, кэшируется."""
+    result = cache.get(CELEBRITIES_KEY)
+    if result is None:
+        popular = Subscription.objects.values_list(
+            'author_id', 'group_id').annotate(
+                followers=Count('id')).filter(
+                    followers__gt=CELEBRITY_FOLLOWERS)
+        result = (
+            {author for author, group, _ in popular if author},
+            {group for author, group, _ in popular if group},
+        )
+        cache.set(CELEBRITIES_KEY, result, CELEBRITIES_TIMEOUT)
+
+    return result
+
+
+def trim_timelines(user_ids):
+    """Оставляет в лентах пользователей TIMELINE_SIZE новых записей."""
+    for user_id in user_ids:
+        keep = TimelineEntry.objects.filter(user_id=user_id).order_by(
+            '-pub_date', '-post_id').values('pk')[:TIMELINE_SIZE]
+        TimelineEntry.objects.filter(user_id=user_id).exclude(
+            pk__in=keep).delete()
+
+
+def fan_out(post):
+    """Рассылает новый пост по лентам подписчиков автора и группы.
+    Посты знаменитостей не рассылаются, а читаются при выводе ленты."""
+    authors, groups = celebrities()
+    sources = Q()
+    if post.author_id not in authors:
+        sources |= Q(author_id=post.author_id)
+    if post.group_id is not None and post.group_id not in groups:
+        sources |= Q(group_id=post.group_id)
+    if not sources:
+        return
+    user_ids = set(Subscription.objects.filter(sources).exclude(
+        user_id=post.author_id).values_list('user_id', flat=True))
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+         for user_id in user_ids),
+        ignore_conflicts=True,
+    )
+    trim_timelines(user_ids)
+
+
+def backfill(subscription):
+    """Добавляет в ленту подписчика последние посты новой подписки."""
+    if subscription.author_id is not None:
+        posts = Post.objects.filter(author_id=subscription.author_id)
+    else:
+        posts = Post.objects.filter(group_id=subscription.group_id)
+    recent = posts.order_by('-pub_date').values_list('pk', 'pub_date')[
+        :TIMELINE_SIZE]
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(user_id=subscription.user_id, post_id=post_id,
+                       pub_date=pub_date)
+         for post_id, pub_date in recent),
+        ignore_conflicts=True,
+    )
+    trim_timelines([subscription.user_id])
+
+
+def refill(author_ids, group_ids):
+    """Дополняет ленты подписчиков постами, созданными в обход
+    сигналов (импорт): заново заполняет подписки на этих авторов
+    и группы. Возвращает число подписок."""
+    authors, groups = celebrities()
+    subscriptions = Subscription.objects.filter(
+        Q(author_id__in=set(author_ids) - authors)
+        | Q(group_id__in=set(group_ids) - groups))
+    count = 0
+    for subscription in subscriptions.iterator():
+        backfill(subscription)
+        count += 1
+
+    return count
+
+
+def unfollow(subscription):
+    """Убирает из ленты посты отменённой подписки, кроме тех,
+    что попадают в ленту через другие подписки."""
+    other = Subscription.objects.filter(
+        user_id=subscription.user_id).exclude(pk=subscription.pk)
+    other_authors = other.filter(author__isnull=False).values('author')
+    other_groups = other.filter(group__isnull=False).values('group')
+    if subscription.author_id is not None:
+        lost = Q(post__author_id=subscription.author_id)
+    else:
+        lost = Q(post__group_id=subscription.group_id)
+    TimelineEntry.objects.filter(lost, user_id=subscription.user_id).exclude(
+        Q(post__author__in=other_authors) | Q(post__group__in=other_groups)
+    ).delete()
+
+
+def timeline_posts(user):
+    """Посты ленты подписок. Без знаменитостей в подписках это один
+    проход по индексу (user, pub_date) таблицы ленты."""
+    celebrity_authors, celebrity_groups = celebrities()
+    authors, groups = set(), set()
+    if celebrity_authors or celebrity_groups:
+        for author, group in Subscription.objects.filter(
+                user=user).values_list('author_id', 'group_id'):
+            if author in celebrity_authors:
+                authors.add(author)
+            if group in celebrity_groups:
+                groups.add(group)
+    if not (authors or groups):
+        return Post.objects.feed().filter(
+            timeline_entries__user=user,
+        ).order_by(
+            F('timeline_entries__pub_date').desc(),
+            F('timeline_entries__post_id').desc(),
+        )
+
+    return Post.objects.feed().filter(
+        Q(timeline_entries__user=user)
+        | Q(author__in=authors)
+        | Q(group__in=groups)
+    ).distinct().order_by('-pub_date', '-id')
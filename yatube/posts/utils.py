@@ -1,12 +1,251 @@
+import base64
+import binascii
+import hashlib
+from collections.abc import Sequence
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.utils import make_template_fragment_key
 from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .constants import (
+    COUNT_CACHE_TIMEOUT, NUM_PAGE, PAGE_WINDOW, POST_CARD_CACHE,
+    POST_CARD_FRAGMENT, POST_CARD_VIEWS,
+)
+from .models import Post
+
+
+class CursorPage(Sequence):
+    """Страница ленты, построенная по курсору (pub_date, id)."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Cursor page of %s posts>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def encode_cursor(post, reverse=False):
+    """Непрозрачный токен курсора для поста."""
+    raw = '%s|%s|%d' % (post.pub_date.isoformat(), post.id, reverse)
+
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Разбор токена курсора. Для битого токена возвращает None."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        pub_date, post_id, reverse = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        post_id = int(post_id)
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        return None
+    if pub_date is None:
+        return None
+
+    return pub_date, post_id, reverse == '1'
+
+
+def cursor_paginator(request, posts, num=NUM_PAGE):
+    """Постраничный вывод по ключу (pub_date, id) без COUNT и OFFSET."""
+    cursor = decode_cursor(request.GET.get('cursor', ''))
+    if cursor is None:
+        rows = list(posts.order_by('-pub_date', '-id')[:num + 1])
+        page_rows = rows[:num]
+        has_next, has_previous = len(rows) > num, False
+    else:
+        pub_date, post_id, reverse = cursor
+        if reverse:
+            rows = list(posts.filter(
+                Q(pub_date__gt=pub_date)
+                | Q(pub_date=pub_date, id__gt=post_id)
+            ).order_by('pub_date', 'id')[:num + 1])
+            page_rows = rows[:num][::-1]
+            has_next, has_previous = True, len(rows) > num
+        else:
+            rows = list(posts.filter(
+                Q(pub_date__lt=pub_date)
+                | Q(pub_date=pub_date, id__lt=post_id)
+            ).order_by('-pub_date', '-id')[:num + 1])
+            page_rows = rows[:num]
+            has_next, has_previous = len(rows) > num, True
+
+    next_cursor = previous_cursor = None
+    if page_rows and has_next:
+        next_cursor = encode_cursor(page_rows[-1])
+    if page_rows and has_previous:
+        previous_cursor = encode_cursor(page_rows[0], reverse=True)
 
-from .constants import NUM_PAGE
+    return CursorPage(page_rows, next_cursor, previous_cursor)
 
 
-def paginator(request, posts, num=NUM_PAGE):
-    """Paginator func."""
-    paginator = Paginator(posts, num)
+def page_window(number, num_pages, around=PAGE_WINDOW):
+    """Номера страниц для навигации: первая, последняя и around
+    соседей текущей. None - пропуск (многоточие); пропуск в одну
+    страницу заменяется самой страницей."""
+    shown = sorted({1, num_pages, *range(
+        max(1, number - around), min(num_pages, number + around) + 1)})
+    window = []
+    for page in shown:
+        if window and page - window[-1] == 2:
+            window.append(page - 1)
+        elif window and page - window[-1] > 2:
+            window.append(None)
+        window.append(page)
+
+    return window
+
+
+def count_cache_key(queryset):
+    """Ключ кэша числа записей: подпись запроса без полей и сортировки,
+    так что group.posts.feed() и Post.objects.filter(group=...)
+    делят один ключ."""
+    sql, params = queryset.values('pk').order_by().query.sql_with_params()
+    digest = hashlib.md5(f'{sql}|{params}'.encode()).hexdigest()
+
+    return f'post-count:{digest}'
+
+
+def estimate_count(queryset):
+    """Число строк таблицы по статистике планировщика: sqlite_stat1
+    (заполняется ANALYZE) или pg_class.reltuples. None - статистики нет."""
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                [table])
+            row = cursor.fetchone()
+            rows = int(row[0].split()[0]) if row else None
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class '
+                'WHERE oid = %s::regclass', [table])
+            row = cursor.fetchone()
+            rows = row[0] if row and row[0] >= 0 else None
+        else:
+            rows = None
+
+    return rows
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator с закэшированным числом записей.
+
+    Число хранится COUNT_CACHE_TIMEOUT секунд под подписью запроса,
+    создание и удаление постов сдвигают его (shift_post_counts).
+    Для всей таблицы больше POSTS_COUNT_ESTIMATE_THRESHOLD строк
+    вместо COUNT(*) берётся оценка из статистики БД.
+    """
+
+    @cached_property
+    def count(self):
+        key = count_cache_key(self.object_list)
+        count = cache.get(key)
+        if count is None:
+            if not self.object_list.query.where:
+                count = estimate_count(self.object_list)
+            if count is None or (
+                    count < settings.POSTS_COUNT_ESTIMATE_THRESHOLD):
+                count = super().count
+            cache.add(key, count, COUNT_CACHE_TIMEOUT)
+
+        return count
+
+
+def shift_post_counts(delta, author_id=None, group_id=None):
+    """Сдвигает закэшированные числа постов лент, в которые входит пост.
+    С author_id - главной и автора, с group_id - группы.
+    Незакэшированные числа не трогаем."""
+    querysets = []
+    if author_id is not None:
+        querysets += [
+            Post.objects.all(), Post.objects.filter(author_id=author_id)]
+    if group_id is not None:
+        querysets.append(Post.objects.filter(group_id=group_id))
+    for queryset in querysets:
+        try:
+            cache.incr(count_cache_key(queryset), delta)
+        except ValueError:
+            pass
+
+
+def paginator(request, posts, num=NUM_PAGE, cursor=None,
+              cached_count=False):
+    """Paginator func.
+    cursor: постраничный вывод по курсору; по умолчанию из настроек.
+    cached_count: брать число постов из кэша (CachedCountPaginator);
+    подходит для лент главной, групп и авторов."""
+    if cursor is None:
+        cursor = getattr(settings, 'POSTS_CURSOR_PAGINATION', False)
+    if cursor:
+        return cursor_paginator(request, posts, num)
+    paginator_class = CachedCountPaginator if cached_count else Paginator
+    paginator = paginator_class(posts, num)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    page_obj.page_window = page_window(page_obj.number, paginator.num_pages)
 
     return page_obj
+
+
+def evict_post_cards(posts):
+    """Удаляет из кэша карточки постов.
+    posts: пары (id, updated_at) или объекты Post."""
+    keys = []
+    for post in posts:
+        post_id, updated_at = (
+            post if isinstance(post, tuple) else (post.id, post.updated_at))
+        keys.extend(
+            make_template_fragment_key(
+                POST_CARD_FRAGMENT, [post_id, updated_at, view_name])
+            for view_name in POST_CARD_VIEWS
+        )
+    caches[POST_CARD_CACHE].delete_many(keys)
+
+
+@contextmanager
+def keep_dates():
+    """Отключает auto_now_add/auto_now у дат поста, чтобы сохранить
+    заданные (импорт, заполнение базы для бенчмарков)."""
+    fields = [
+        Post._meta.get_field(name) for name in ('pub_date', 'updated_at')]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
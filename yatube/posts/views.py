@@ -1,69 +1,167 @@
+from urllib.parse import urlencode
+
 from django.shortcuts import render, get_object_or_404
 from django.shortcuts import redirect
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.views.decorators.http import require_POST
 
-from .models import Post, Group, User
+from .models import AuthorPostsCounter, Post, Group, Subscription, User
+from .export import EXPORT_FORMATS, export_lines, export_rows
 from .forms import PostForm
+from .page_cache import cache_feed_page, condition_on_post
+from .search import SearchResults
+from .timeline import timeline_posts
 from .utils import paginator
 
 
-def _get_post_objects():
-    """Получаем объекты модели пост."""
-    result = Post.objects.select_related('author', 'group').all()
+def _author_posts_count(author):
+    """Число постов автора из счётчика, без COUNT по таблице постов."""
+    try:
+        return author.posts_counter.posts_count
+    except AuthorPostsCounter.DoesNotExist:
+        return 0
+
+
+def _is_following(user, **subscribed_to):
+    """Подписан ли пользователь на автора или группу."""
+    if not user.is_authenticated:
+        return False
 
-    return result
+    return Subscription.objects.filter(user=user, **subscribed_to).exists()
 
 
+@cache_feed_page('home')
 def index(request):
     """Вывод главной страницы с постами."""
-    posts = _get_post_objects()
+    posts = Post.objects.feed()
     context = {
-        'page_obj': paginator(request, posts),
+        'page_obj': paginator(request, posts, cached_count=True),
     }
 
     return render(request, "posts/index.html", context)
 
 
+@cache_feed_page('group', 'slug')
 def group_posts(request, slug):
     """Вывод страницы с постами конкретной группы."""
     group = Group.objects.get(slug=slug)
-    posts = group.posts.all()
+    posts = group.posts.feed()
 
     context_group = {
         'group': group,
-        'page_obj': paginator(request, posts),
+        'following': _is_following(request.user, group=group),
+        'page_obj': paginator(request, posts, cached_count=True),
     }
 
     return render(request, "posts/group_list.html", context_group)
 
 
+@cache_feed_page('author', 'username')
 def profile(request, username):
     """Вывод страницы с постами конкретного пользователя."""
-    user = get_object_or_404(User, username=username)
-    posts = user.posts.all()
+    user = get_object_or_404(
+        User.objects.select_related('posts_counter'), username=username)
+    posts = user.posts.feed()
 
     context_profile = {
         'author': user,
-        'page_obj': paginator(request, posts),
+        'posts_count': _author_posts_count(user),
+        'following': _is_following(request.user, author=user),
+        'page_obj': paginator(request, posts, cached_count=True),
     }
 
     return render(request, "posts/profile.html", context_profile)
 
 
+@condition_on_post
 def post_detail(request, post_id):
     """Вывод информации о конкретном посте."""
-    post_valid = get_object_or_404(Post, id=post_id)
+    post_valid = get_object_or_404(
+        Post.objects.select_related(
+            'author', 'author__posts_counter', 'group'),
+        id=post_id,
+    )
     context_detail = {
         'post_valid': post_valid,
+        'posts_count': _author_posts_count(post_valid.author),
     }
 
     return render(request, "posts/post_detail.html", context_detail)
 
 
+@login_required
+def follow_index(request):
+    """Лента постов авторов и групп, на которые подписан пользователь."""
+    context = {
+        'page_obj': paginator(request, timeline_posts(request.user)),
+    }
+
+    return render(request, "posts/follow.html", context)
+
+
+@login_required
+@require_POST
+def profile_follow(request, username):
+    """Подписка на автора."""
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Subscription.objects.get_or_create(user=request.user, author=author)
+
+    return redirect('posts:profile', username=username)
+
+
+@login_required
+@require_POST
+def profile_unfollow(request, username):
+    """Отписка от автора."""
+    author = get_object_or_404(User, username=username)
+    for subscription in Subscription.objects.filter(
+            user=request.user, author=author):
+        subscription.delete()
+
+    return redirect('posts:profile', username=username)
+
+
+@login_required
+@require_POST
+def group_follow(request, slug):
+    """Подписка на группу."""
+    group = get_object_or_404(Group, slug=slug)
+    Subscription.objects.get_or_create(user=request.user, group=group)
+
+    return redirect('posts:group', slug=slug)
+
+
+@login_required
+@require_POST
+def group_unfollow(request, slug):
+    """Отписка от группы."""
+    group = get_object_or_404(Group, slug=slug)
+    for subscription in Subscription.objects.filter(
+            user=request.user, group=group):
+        subscription.delete()
+
+    return redirect('posts:group', slug=slug)
+
+
+def search(request):
+    """Полнотекстовый поиск по постам."""
+    query = request.GET.get('q', '').strip()
+    context_search = {
+        'query': query,
+        'page_query': urlencode({'q': query}) + '&',
+        'page_obj': paginator(request, SearchResults(query), cursor=False),
+    }
+
+    return render(request, "posts/search.html", context_search)
+
+
 @login_required
 def post_create(request):
     """Страница создания поста."""
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if request.method == 'POST' and form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
@@ -78,7 +176,11 @@ def post_create(request):
 def post_edit(request, post_id):
     """Страница редактирования созданного ранее поста."""
     post_obj = Post.objects.select_related('author', 'group').get(id=post_id)
-    form = PostForm(request.POST or None, instance=post_obj)
+    form = PostForm(
+        request.POST or None,
+        files=request.FILES or None,
+        instance=post_obj,
+    )
     if request.user == post_obj.author and post_obj:
         if request.method == 'POST' and form.is_valid():
             form.author = request.user
@@ -99,3 +201,30 @@ def post_edit(request, post_id):
         'posts:post_detail',
         post_id=post_id,
     )
+
+
+@staff_member_required
+def export_posts(request):
+    """Потоковая выгрузка постов в CSV или JSONL для сотрудников."""
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return HttpResponseBadRequest('Неизвестный формат выгрузки.')
+    try:
+        rows = export_rows(
+            group=request.GET.get('group'),
+            author=request.GET.get('author'),
+            since=request.GET.get('since'),
+            until=request.GET.get('until'),
+        )
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    content_type = (
+        'text/csv' if fmt == 'csv' else 'application/x-ndjson')
+    response = StreamingHttpResponse(
+        export_lines(rows, fmt),
+        content_type=f'{content_type}; charset=utf-8',
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="posts.{fmt}"')
+
+    return response
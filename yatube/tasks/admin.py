@@ -0,0 +1,64 @@
+from django.contrib import admin
+
+from .mail import requeue_emails
+from .models import QueuedEmail, Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    """Очередь фоновых задач: состояние, попытки, последняя ошибка."""
+
+    list_display = (
+        'pk',
+        'name',
+        'status',
+        'attempts',
+        'run_at',
+        'locked_by',
+        'finished_at',
+    )
+    list_filter = ('status', 'name')
+    readonly_fields = (
+        'attempts',
+        'locked_by',
+        'locked_at',
+        'created_at',
+        'finished_at',
+        'last_error',
+    )
+
+
+class QueuedEmailAdmin(admin.ModelAdmin):
+    """Очередь писем: кому, состояние, попытки."""
+
+    list_display = (
+        'pk',
+        'subject',
+        'recipients',
+        'status',
+        'attempts',
+        'queued_at',
+        'sent_at',
+    )
+    list_filter = ('status',)
+    actions = ('requeue',)
+    exclude = ('message',)
+    readonly_fields = (
+        'subject',
+        'recipients',
+        'attempts',
+        'locked_by',
+        'locked_at',
+        'queued_at',
+        'sent_at',
+        'last_error',
+    )
+
+    def requeue(self, request, queryset):
+        count = requeue_emails(queryset)
+        self.message_user(request, f'Возвращено в очередь писем: {count}')
+
+    requeue.short_description = 'Отправить не отправленные снова'
+
+
+admin.site.register(Task, TaskAdmin)
+admin.site.register(QueuedEmail, QueuedEmailAdmin)
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TasksConfig(AppConfig):
+    name = 'tasks'
+
+    def ready(self):
+        from . import mail  # noqa: F401
+
+        # задачи объявляются в модулях tasks.py приложений
+        autodiscover_modules('tasks')
@@ -0,0 +1,235 @@
+"""Очередь исходящей почты.
+
+QueuedEmailBackend не отправляет письма в запросе: он сохраняет их
+в таблицу QueuedEmail и ставит фоновую задачу flush_mail. Задача
+отправляет очередь пачками по EMAIL_BATCH_SIZE, одна пачка - одно
+соединение настоящего бэкенда EMAIL_QUEUE_BACKEND (SMTP в production,
+файлы локально). Письмо, которое не удалось отправить, остаётся
+в очереди, а задача падает и повторяется с паузой очереди задач.
+
+Попытки письма считаются только по ошибкам самого письма (адрес
+отклонён и т.п.): пока недоступен почтовый сервер, письма ждут,
+сколько бы ни длился сбой. Письма, оставшиеся без задачи отправки,
+подбирает housekeeping исполнителя; не отправленные после
+EMAIL_MAX_ATTEMPTS попыток возвращаются в очередь действием в админке.
+"""
+import pickle
+import smtplib
+import socket
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from .models import QueuedEmail, Task
+from .queue import task
+
+
+# сбой соединения с почтовым сервером, а не ошибка письма
+CONNECTION_ERRORS = (
+    ConnectionError, socket.timeout, smtplib.SMTPServerDisconnected)
+
+
+class MailNotSent(Exception):
+    """Часть писем пачки не отправлена, они остались в очереди."""
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Почтовый бэкенд, ставящий письма в очередь отправки."""
+
+    def send_messages(self, email_messages):
+        emails = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            # соединение не сериализуется, при отправке будет своё
+            message.connection = None
+            emails.append(QueuedEmail(
+                message=pickle.dumps(message),
+                subject=message.subject[:255],
+                recipients=', '.join(message.recipients()),
+            ))
+        if emails:
+            QueuedEmail.objects.bulk_create(emails)
+            schedule_flush()
+
+        return len(emails)
+
+
+def schedule_flush():
+    """Ставит flush_mail, если готовая к запуску ещё не ждёт в очереди:
+    одна задача отправляет все накопившиеся письма. Задача, отложенная
+    для повтора, не в счёт - новые письма не ждут её паузы. Лишняя
+    задача (несколько писем в одной транзакции) найдёт очередь пустой."""
+    waiting = Task.objects.filter(
+        name=flush_mail.task_name,
+        status=Task.PENDING,
+        run_at__lte=timezone.now(),
+    ).exists()
+    if settings.TASKS_EAGER or not waiting:
+        flush_mail.delay()
+
+
+def schedule_stranded_mail():
+    """Ставит flush_mail, если в очереди есть письма, а задачи отправки
+    нет: например, она исчерпала попытки за время сбоя почтового
+    сервера. Возвращает True, если задача поставлена."""
+    stranded = QueuedEmail.objects.filter(
+        status__in=(QueuedEmail.PENDING, QueuedEmail.SENDING)).exists()
+    if not stranded or Task.objects.filter(
+            name=flush_mail.task_name,
+            status__in=(Task.PENDING, Task.RUNNING)).exists():
+        return False
+    flush_mail.delay()
+
+    return True
+
+
+def requeue_emails(emails):
+    """Возвращает в очередь не отправленные письма из emails
+    с новым запасом попыток. Возвращает их число."""
+    count = emails.filter(status=QueuedEmail.FAILED).update(
+        status=QueuedEmail.PENDING, attempts=0, last_error='')
+    if count:
+        schedule_flush()
+
+    return count
+
+
+def claim_emails(token, limit, exclude=()):
+    """Забирает до limit писем на отправку под меткой token, включая
+    брошенные упавшей отправкой дольше TASK_LEASE секунд назад."""
+    now = timezone.now()
+    lease_expired = now - timedelta(seconds=settings.TASK_LEASE)
+    ready = Q(status=QueuedEmail.PENDING) | Q(
+        status=QueuedEmail.SENDING, locked_at__lt=lease_expired)
+    ids = list(QueuedEmail.objects.filter(ready).exclude(
+        pk__in=exclude).order_by('pk').values_list('pk', flat=True)[:limit])
+    if not ids:
+        return []
+    # повторное условие: письма мог забрать параллельный flush_mail
+    QueuedEmail.objects.filter(ready, pk__in=ids).update(
+        status=QueuedEmail.SENDING,
+        locked_by=token,
+        locked_at=now,
+    )
+
+    return list(QueuedEmail.objects.filter(
+        locked_by=token, status=QueuedEmail.SENDING))
+
+
+def send_batch(emails):
+    """Отправляет пачку писем через одно соединение.
+    Возвращает (id отправленных, {id: ошибка письма}, ошибка
+    соединения); при сбое соединения остаток пачки не отправляется."""
+    sent, failed = [], {}
+    connection = get_connection(settings.EMAIL_QUEUE_BACKEND)
+    try:
+        connection.open()
+        for email in emails:
+            try:
+                message = pickle.loads(email.message)
+                message.connection = connection
+                if connection.send_messages([message]):
+                    sent.append(email.pk)
+                else:
+                    failed[email.pk] = 'Бэкенд не отправил письмо'
+            except CONNECTION_ERRORS:
+                raise
+            except Exception:
+                failed[email.pk] = traceback.format_exc()
+    except Exception:
+        return sent, failed, traceback.format_exc()
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    return sent, failed, ''
+
+
+def finish_batch(emails, sent, failed, error=''):
+    """Записывает итог пачки. Попытка засчитывается только письму
+    с собственной ошибкой; не дошедшие до отправки из-за сбоя
+    соединения возвращаются в очередь как есть."""
+    now = timezone.now()
+    QueuedEmail.objects.filter(pk__in=sent).update(
+        status=QueuedEmail.SENT, sent_at=now, message=b'',
+        locked_by='', locked_at=None, last_error='',
+    )
+    for email in emails:
+        if email.pk in failed:
+            exhausted = email.attempts + 1 >= settings.EMAIL_MAX_ATTEMPTS
+            QueuedEmail.objects.filter(pk=email.pk).update(
+                status=(QueuedEmail.FAILED if exhausted
+                        else QueuedEmail.PENDING),
+                attempts=F('attempts') + 1,
+                locked_by='', locked_at=None, last_error=failed[email.pk],
+            )
+    unsent = [email.pk for email in emails
+              if email.pk not in failed and email.pk not in sent]
+    QueuedEmail.objects.filter(pk__in=unsent).update(
+        status=QueuedEmail.PENDING,
+        locked_by='', locked_at=None, last_error=error,
+    )
+
+
+@task()
+def flush_mail():
+    """Отправляет очередь писем пачками по EMAIL_BATCH_SIZE."""
+    token = uuid.uuid4().hex
+    tried, not_sent = set(), 0
+    while True:
+        emails = claim_emails(token, settings.EMAIL_BATCH_SIZE, tried)
+        if not emails:
+            break
+        tried.update(email.pk for email in emails)
+        sent, failed, error = send_batch(emails)
+        finish_batch(emails, sent, failed, error)
+        not_sent += len(emails) - len(sent)
+        if error:
+            # сервер недоступен: остальные пачки подождут повтора
+            break
+    finished = timezone.now() - timedelta(seconds=settings.TASK_KEEP_DONE)
+    QueuedEmail.objects.filter(
+        status=QueuedEmail.SENT, sent_at__lt=finished).delete()
+    if not_sent:
+        raise MailNotSent(f'Не отправлено писем: {not_sent}')
+
+
+def _percentile(values, share):
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def mail_queue_stats():
+    """Глубина очереди по состояниям, возраст самого старого
+    неотправленного письма и задержка отправки (от постановки
+    до отправки) по последним EMAIL_METRICS_WINDOW письмам, в секундах."""
+    now = timezone.now()
+    stats = {status: 0 for status, _ in QueuedEmail.STATUSES}
+    stats.update(QueuedEmail.objects.order_by().values_list(
+        'status').annotate(Count('pk')))
+    oldest = QueuedEmail.objects.filter(
+        status__in=(QueuedEmail.PENDING, QueuedEmail.SENDING),
+    ).aggregate(oldest=Min('queued_at'))['oldest']
+    stats['oldest_age'] = (now - oldest).total_seconds() if oldest else 0.0
+    latencies = sorted(
+        (sent_at - queued_at).total_seconds()
+        for queued_at, sent_at in QueuedEmail.objects.filter(
+            status=QueuedEmail.SENT,
+        ).order_by('-sent_at').values_list(
+            'queued_at', 'sent_at')[:settings.EMAIL_METRICS_WINDOW]
+    )
+    stats['latency_count'] = len(latencies)
+    stats['latency_avg'] = (
+        sum(latencies) / len(latencies) if latencies else 0.0)
+    stats['latency_p50'] = _percentile(latencies, 0.5) if latencies else 0.0
+    stats['latency_p95'] = _percentile(latencies, 0.95) if latencies else 0.0
+
+    return stats
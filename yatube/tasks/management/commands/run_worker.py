@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.worker import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет фоновые задачи из очереди в БД пулом процессов. '
+        'Завершается по SIGTERM или Ctrl+C, доделав начатые задачи.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.TASK_PROCESSES,
+            help='Процессов в пуле; 0 - выполнять задачи в этом процессе.',
+        )
+        parser.add_argument(
+            '--poll', type=float, default=settings.TASK_POLL_INTERVAL,
+            help='Пауза между опросами пустой очереди, в секундах.',
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Завершиться, когда готовых задач не останется.',
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            options['processes'], options['poll'], burst=options['burst'])
+        self.stdout.write(
+            f'Исполнитель {worker.name}: процессов {worker.processes}.')
+        processed = worker.run()
+        self.stdout.write(f'Обработано задач: {processed}.')
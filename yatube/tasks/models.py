@@ -0,0 +1,97 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """Задача фоновой очереди: вызов зарегистрированной функции
+    с аргументами в JSON, который выполнит manage.py run_worker."""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Не выполнена'),
+    )
+
+    name = models.CharField('Функция', max_length=200)
+    kwargs = models.TextField('Аргументы', default='{}')
+    status = models.CharField(
+        'Состояние',
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+    )
+    attempts = models.PositiveIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveIntegerField('Наибольшее число попыток')
+    run_at = models.DateTimeField('Выполнить после', default=timezone.now)
+    locked_by = models.CharField('Исполнитель', max_length=100, blank=True)
+    locked_at = models.DateTimeField('Взята', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Поставлена', auto_now_add=True)
+    finished_at = models.DateTimeField('Завершена', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = (
+            models.Index(
+                fields=('status', 'run_at'),
+                name='task_status_run_at_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
+
+
+class QueuedEmail(models.Model):
+    """Письмо в очереди отправки tasks.mail.QueuedEmailBackend.
+    message - EmailMessage в pickle, после отправки очищается."""
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (SENDING, 'Отправляется'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    message = models.BinaryField('Письмо')
+    subject = models.CharField('Тема', max_length=255, blank=True)
+    recipients = models.TextField('Получатели', blank=True)
+    status = models.CharField(
+        'Состояние',
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+    )
+    attempts = models.PositiveIntegerField('Попыток', default=0)
+    locked_by = models.CharField('Отправка', max_length=100, blank=True)
+    locked_at = models.DateTimeField('Взято', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    queued_at = models.DateTimeField('Поставлено', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = (
+            models.Index(
+                fields=('status', 'queued_at'),
+                name='email_status_queued_at_idx',
+            ),
+            models.Index(
+                fields=('status', 'sent_at'),
+                name='email_status_sent_at_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipients} ({self.status})'
@@ -0,0 +1,27 @@
+"""Точки входа процессов пула run_worker.
+
+Процесс пула запускается через spawn и импортирует этот модуль до
+django.setup(), поэтому модели и всё, что их импортирует, подключаются
+только внутри функций.
+"""
+import signal
+
+
+def init_process():
+    """Настраивает Django в новом процессе. Ctrl+C обрабатывает главный
+    процесс: он дожидается начатых задач."""
+    import django
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    django.setup()
+
+
+def run_in_process(pk):
+    from django.db import connections
+
+    from .queue import run_task
+
+    try:
+        return run_task(pk)
+    finally:
+        connections.close_all()
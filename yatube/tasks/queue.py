@@ -0,0 +1,166 @@
+"""Очередь фоновых задач в таблице БД, без внешнего брокера.
+
+Функция-задача объявляется декоратором @task в модуле tasks.py
+приложения и ставится в очередь вызовом func.delay(**kwargs): строка
+в таблице появляется только после фиксации текущей транзакции, поэтому
+исполнитель не увидит задачу раньше данных, которые она обрабатывает.
+При TASKS_EAGER задача выполняется сразу, без очереди.
+
+Исполнитель (manage.py run_worker) забирает задачи условным UPDATE:
+из нескольких исполнителей задачу получит только один. Упавшая задача
+повторяется с экспоненциальной паузой, брошенная (исполнитель умер)
+забирается снова по истечении TASK_LEASE.
+"""
+import json
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+# имя задачи -> функция
+registry = {}
+
+
+def task(max_attempts=None):
+    """Регистрирует функцию как фоновую задачу и добавляет ей delay().
+    Аргументы задачи - только именованные и сериализуемые в JSON."""
+    def decorator(func):
+        name = f'{func.__module__}.{func.__name__}'
+        registry[name] = func
+        func.task_name = name
+        func.max_attempts = max_attempts
+        func.delay = lambda **kwargs: enqueue(func, **kwargs)
+
+        return func
+
+    return decorator
+
+
+def enqueue(func, **kwargs):
+    """Ставит задачу в очередь после фиксации транзакции."""
+    if settings.TASKS_EAGER:
+        try:
+            func(**kwargs)
+        except Exception:
+            logger.exception('Задача %s завершилась ошибкой', func.task_name)
+        return
+    payload = json.dumps(kwargs, cls=DjangoJSONEncoder)
+    max_attempts = func.max_attempts or settings.TASK_MAX_ATTEMPTS
+    transaction.on_commit(lambda: Task.objects.create(
+        name=func.task_name,
+        kwargs=payload,
+        max_attempts=max_attempts,
+    ))
+
+
+def retry_delay(attempt):
+    """Пауза в секундах перед повтором после попытки attempt:
+    удваивается с каждой попыткой, с разбросом, чтобы задачи,
+    упавшие вместе, не повторялись одновременно."""
+    delay = min(
+        settings.TASK_RETRY_DELAY * 2 ** (attempt - 1),
+        settings.TASK_RETRY_MAX_DELAY,
+    )
+
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim(worker, limit):
+    """Забирает до limit готовых к выполнению задач для исполнителя
+    worker. Возвращает их id."""
+    now = timezone.now()
+    lease_expired = now - timedelta(seconds=settings.TASK_LEASE)
+    candidates = Task.objects.filter(
+        Q(status=Task.PENDING, run_at__lte=now)
+        | Q(status=Task.RUNNING, locked_at__lt=lease_expired),
+        attempts__lt=F('max_attempts'),
+    ).order_by('run_at', 'pk').values_list('pk', 'status', 'locked_at')
+    claimed = []
+    for pk, status, locked_at in candidates[:limit * 2]:
+        # условие на прежнее состояние: задачу уже мог забрать другой
+        taken = Task.objects.filter(
+            pk=pk, status=status, locked_at=locked_at,
+        ).update(
+            status=Task.RUNNING,
+            locked_by=worker,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if taken:
+            claimed.append(pk)
+            if len(claimed) == limit:
+                break
+
+    return claimed
+
+
+def fail_abandoned():
+    """Брошенные задачи без оставшихся попыток помечаются
+    невыполненными. Возвращает их число."""
+    lease_expired = timezone.now() - timedelta(seconds=settings.TASK_LEASE)
+
+    return Task.objects.filter(
+        status=Task.RUNNING,
+        locked_at__lt=lease_expired,
+        attempts__gte=F('max_attempts'),
+    ).update(
+        status=Task.FAILED,
+        finished_at=timezone.now(),
+        last_error='Исполнитель не завершил задачу за TASK_LEASE',
+    )
+
+
+def run_task(pk):
+    """Выполняет забранную задачу и записывает результат.
+    Возвращает True, если задача выполнена."""
+    task = Task.objects.get(pk=pk)
+    # если аренда истекла и задачу забрал другой исполнитель,
+    # её состояние больше не наше
+    mine = Task.objects.filter(
+        pk=pk, locked_by=task.locked_by, locked_at=task.locked_at)
+    func = registry.get(task.name)
+    try:
+        if func is None:
+            raise LookupError(f'Задача {task.name} не зарегистрирована')
+        func(**json.loads(task.kwargs))
+    except Exception:
+        logger.exception('Задача %s завершилась ошибкой', task)
+        now = timezone.now()
+        if func is None or task.attempts >= task.max_attempts:
+            mine.update(
+                status=Task.FAILED,
+                finished_at=now,
+                last_error=traceback.format_exc(),
+            )
+        else:
+            mine.update(
+                status=Task.PENDING,
+                run_at=now + timedelta(seconds=retry_delay(task.attempts)),
+                locked_by='',
+                locked_at=None,
+                last_error=traceback.format_exc(),
+            )
+        return False
+
+    mine.update(status=Task.DONE, finished_at=timezone.now())
+
+    return True
+
+
+def purge_done():
+    """Удаляет выполненные задачи старше TASK_KEEP_DONE секунд."""
+    finished = timezone.now() - timedelta(seconds=settings.TASK_KEEP_DONE)
+    deleted, _ = Task.objects.filter(
+        status=Task.DONE, finished_at__lt=finished).delete()
+
+    return deleted
@@ -0,0 +1,185 @@
+import smtplib
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from tasks.mail import MailNotSent, flush_mail, mail_queue_stats
+from tasks.models import QueuedEmail, Task
+from tasks.worker import Worker
+
+User = get_user_model()
+
+opened = []
+
+
+class CountingBackend(EmailBackend):
+    """locmem, который считает открытые соединения, не принимает
+    писем на адрес из BROKEN и не соединяется при down."""
+
+    BROKEN = 'broken@example.com'
+    down = False
+
+    def open(self):
+        if self.down:
+            raise ConnectionRefusedError('Сервер недоступен')
+        opened.append(self)
+
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if self.BROKEN in message.recipients():
+                raise smtplib.SMTPRecipientsRefused(
+                    {self.BROKEN: (550, b'Recipient rejected')})
+
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='tasks.mail.QueuedEmailBackend',
+    EMAIL_QUEUE_BACKEND='tasks.tests.test_mail.CountingBackend',
+    TASKS_EAGER=False,
+    EMAIL_BATCH_SIZE=2,
+    EMAIL_MAX_ATTEMPTS=2,
+)
+class TestQueuedEmail(TestCase):
+    """Проверяем очередь писем."""
+
+    def setUp(self):
+        opened.clear()
+        CountingBackend.down = False
+
+    def send(self, count, to='reader@example.com'):
+        for index in range(count):
+            mail.send_mail(f'Письмо {index}', 'Текст', None, [to])
+
+    def test_send_only_queues(self):
+        """Отправка в запросе только ставит письмо в очередь."""
+        self.send(1)
+        self.assertEqual(mail.outbox, [])
+        email = QueuedEmail.objects.get()
+        self.assertEqual(
+            (email.status, email.recipients),
+            (QueuedEmail.PENDING, 'reader@example.com'),
+        )
+
+    def test_flush_sends_in_batches(self):
+        """Очередь отправляется пачками, пачка - одно соединение."""
+        self.send(5)
+        flush_mail()
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(len(opened), 3)
+        self.assertFalse(QueuedEmail.objects.exclude(
+            status=QueuedEmail.SENT).exists())
+        stats = mail_queue_stats()
+        self.assertEqual((stats['pending'], stats['sent']), (0, 5))
+        self.assertEqual(stats['latency_count'], 5)
+
+    def test_failed_email_stays_queued(self):
+        """Неотправленное письмо остаётся в очереди, задача падает
+        для повтора; после EMAIL_MAX_ATTEMPTS письмо не отправляется."""
+        self.send(1, to=CountingBackend.BROKEN)
+        self.send(1)
+        with self.assertRaises(MailNotSent):
+            flush_mail()
+        self.assertEqual(len(mail.outbox), 1)
+        broken = QueuedEmail.objects.get(
+            recipients=CountingBackend.BROKEN)
+        self.assertEqual(broken.status, QueuedEmail.PENDING)
+        self.assertIn('Recipient rejected', broken.last_error)
+        self.assertEqual(mail_queue_stats()['pending'], 1)
+
+        with self.assertRaises(MailNotSent):
+            flush_mail()
+        broken.refresh_from_db()
+        self.assertEqual(broken.status, QueuedEmail.FAILED)
+
+    def test_connection_failure_not_counted(self):
+        """Сбой соединения не расходует попытки писем."""
+        self.send(3)
+        CountingBackend.down = True
+        for _ in range(3):
+            with self.assertRaises(MailNotSent):
+                flush_mail()
+        self.assertEqual(
+            set(QueuedEmail.objects.values_list('status', 'attempts')),
+            {(QueuedEmail.PENDING, 0)})
+        self.assertIn('Сервер недоступен',
+                      QueuedEmail.objects.first().last_error)
+
+        CountingBackend.down = False
+        flush_mail()
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_requeue_failed_in_admin(self):
+        """Не отправленное письмо возвращается в очередь из админки."""
+        self.send(1)
+        email = QueuedEmail.objects.get()
+        QueuedEmail.objects.update(status=QueuedEmail.FAILED, attempts=2)
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        self.client.post('/admin/tasks/queuedemail/', {
+            'action': 'requeue', '_selected_action': [email.pk]})
+        email.refresh_from_db()
+        self.assertEqual(
+            (email.status, email.attempts), (QueuedEmail.PENDING, 0))
+        flush_mail()
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(TASKS_EAGER=True)
+    def test_password_reset(self):
+        """Письмо сброса пароля уходит через очередь."""
+        User.objects.create_user(
+            'Artem', email='artem@example.com', password='password')
+        response = self.client.post(
+            '/auth/password_reset/', {'email': 'artem@example.com'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(
+            QueuedEmail.objects.get().status, QueuedEmail.SENT)
+
+    def test_stats_view(self):
+        self.send(2)
+        User.objects.create_user('admin', is_staff=True)
+        self.client.force_login(User.objects.get(username='admin'))
+        content = self.client.get('/debug/mail/').content.decode()
+        self.assertIn('pending 2', content)
+
+
+@override_settings(
+    EMAIL_BACKEND='tasks.mail.QueuedEmailBackend', TASKS_EAGER=False)
+class TestFlushScheduling(TransactionTestCase):
+    """Пока flush_mail ждёт в очереди, новая не ставится."""
+
+    def test_one_flush_task_scheduled(self):
+        for index in range(3):
+            mail.send_mail(
+                f'Письмо {index}', 'Текст', None, ['reader@example.com'])
+        self.assertEqual(
+            Task.objects.filter(name=flush_mail.task_name).count(), 1)
+        self.assertEqual(QueuedEmail.objects.count(), 3)
+
+    def test_retrying_flush_does_not_delay_new_mail(self):
+        """Отложенная для повтора задача не мешает поставить новую."""
+        Task.objects.create(
+            name=flush_mail.task_name, kwargs='{}', max_attempts=5,
+            run_at=timezone.now() + timedelta(minutes=5))
+        mail.send_mail('Письмо', 'Текст', None, ['reader@example.com'])
+        self.assertEqual(
+            Task.objects.filter(name=flush_mail.task_name).count(), 2)
+
+    def test_housekeeping_schedules_stranded_mail(self):
+        """Письма без задачи отправки подбирает housekeeping."""
+        mail.send_mail('Письмо', 'Текст', None, ['reader@example.com'])
+        Task.objects.update(status=Task.FAILED)
+        Worker(processes=0, poll_interval=0).housekeeping()
+        self.assertTrue(Task.objects.filter(
+            name=flush_mail.task_name, status=Task.PENDING).exists())
+        Worker(processes=0, poll_interval=0).housekeeping()
+        self.assertEqual(Task.objects.filter(
+            name=flush_mail.task_name, status=Task.PENDING).count(), 1)
@@ -0,0 +1,142 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import (
+    SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.queue import claim, fail_abandoned, retry_delay, run_task, task
+
+calls = []
+
+
+@task(max_attempts=2)
+def remember(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def explode():
+    raise RuntimeError('Сбой задачи')
+
+
+def add_task(func, **kwargs):
+    return Task.objects.create(
+        name=func.task_name,
+        kwargs=json.dumps(kwargs),
+        max_attempts=func.max_attempts,
+    )
+
+
+class TestRetryDelay(SimpleTestCase):
+    """Проверяем паузу перед повтором."""
+
+    @override_settings(TASK_RETRY_DELAY=10, TASK_RETRY_MAX_DELAY=60)
+    def test_delay_doubles_up_to_limit(self):
+        """Пауза удваивается с каждой попыткой и ограничена сверху."""
+        for attempt, expected in ((1, 10), (2, 20), (3, 40), (6, 60)):
+            delay = retry_delay(attempt)
+            self.assertGreaterEqual(delay, expected * 0.8)
+            self.assertLessEqual(delay, expected * 1.2)
+
+
+@override_settings(TASKS_EAGER=False)
+class TestQueue(TestCase):
+    """Проверяем выполнение задач из очереди."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_claim_is_exclusive(self):
+        """Задачу забирает только один исполнитель."""
+        pk = add_task(remember, value=1).pk
+        self.assertEqual(claim('first', 5), [pk])
+        self.assertEqual(claim('second', 5), [])
+        task = Task.objects.get(pk=pk)
+        self.assertEqual(
+            (task.status, task.locked_by, task.attempts),
+            (Task.RUNNING, 'first', 1),
+        )
+
+    def test_run_task(self):
+        """Задача выполняется с аргументами из JSON."""
+        pk = add_task(remember, value=42).pk
+        claim('worker', 1)
+        self.assertTrue(run_task(pk))
+        self.assertEqual(calls, [42])
+        self.assertEqual(Task.objects.get(pk=pk).status, Task.DONE)
+
+    def test_failed_task_retried_with_backoff(self):
+        """Упавшая задача откладывается, после последней попытки -
+        помечается невыполненной."""
+        pk = add_task(explode).pk
+        claim('worker', 1)
+        with self.assertLogs('tasks.queue', 'ERROR'):
+            self.assertFalse(run_task(pk))
+        task = Task.objects.get(pk=pk)
+        self.assertEqual(task.status, Task.PENDING)
+        self.assertGreater(task.run_at, timezone.now())
+        self.assertIn('Сбой задачи', task.last_error)
+        self.assertEqual(claim('worker', 1), [])
+
+        Task.objects.filter(pk=pk).update(run_at=timezone.now())
+        claim('worker', 1)
+        with self.assertLogs('tasks.queue', 'ERROR'):
+            run_task(pk)
+        task = Task.objects.get(pk=pk)
+        self.assertEqual((task.status, task.attempts), (Task.FAILED, 2))
+
+    def test_abandoned_task_reclaimed(self):
+        """Задача брошенного исполнителя забирается снова
+        по истечении аренды, без попыток - закрывается."""
+        pk = add_task(remember, value=1).pk
+        claim('dead', 1)
+        self.assertEqual(claim('alive', 1), [])
+        expired = timezone.now() - timedelta(hours=1)
+        Task.objects.filter(pk=pk).update(locked_at=expired)
+        self.assertEqual(claim('alive', 1), [pk])
+
+        Task.objects.filter(pk=pk).update(locked_at=expired)
+        self.assertEqual(claim('late', 1), [])
+        self.assertEqual(fail_abandoned(), 1)
+        self.assertEqual(Task.objects.get(pk=pk).status, Task.FAILED)
+
+    def test_run_worker_burst(self):
+        """run_worker --burst выполняет готовые задачи и завершается."""
+        add_task(remember, value=1)
+        add_task(remember, value=2)
+        out = StringIO()
+        call_command('run_worker', processes=0, burst=True, stdout=out)
+        self.assertEqual(sorted(calls), [1, 2])
+        self.assertIn('Обработано задач: 2', out.getvalue())
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager(self):
+        """При TASKS_EAGER задача выполняется сразу, без очереди."""
+        remember.delay(value=7)
+        self.assertEqual(calls, [7])
+        self.assertFalse(Task.objects.exists())
+
+
+@override_settings(TASKS_EAGER=False)
+class TestEnqueueOnCommit(TransactionTestCase):
+    """Задача попадает в очередь только после фиксации транзакции."""
+
+    def test_enqueue_after_commit(self):
+        with transaction.atomic():
+            remember.delay(value=3)
+            self.assertFalse(Task.objects.exists())
+        task = Task.objects.get()
+        self.assertEqual(task.name, remember.task_name)
+        self.assertEqual(task.max_attempts, 2)
+
+        with self.assertRaises(ZeroDivisionError):
+            with transaction.atomic():
+                remember.delay(value=4)
+                1 / 0
+        self.assertEqual(Task.objects.count(), 1)
@@ -0,0 +1,24 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse
+
+from .mail import mail_queue_stats
+
+
+@staff_member_required
+def mail_queue(request):
+    """Глубина очереди писем и задержка их отправки."""
+    stats = mail_queue_stats()
+    lines = [
+        f'pending {stats["pending"]}',
+        f'sending {stats["sending"]}',
+        f'sent {stats["sent"]}',
+        f'failed {stats["failed"]}',
+        f'oldest_pending_s {stats["oldest_age"]:.1f}',
+        f'latency_window {stats["latency_count"]}',
+        f'latency_avg_s {stats["latency_avg"]:.3f}',
+        f'latency_p50_s {stats["latency_p50"]:.3f}',
+        f'latency_p95_s {stats["latency_p95"]:.3f}',
+    ]
+
+    return HttpResponse(
+        '\n'.join(lines), content_type='text/plain; charset=utf-8')
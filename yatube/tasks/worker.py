@@ -0,0 +1,117 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .mail import schedule_stranded_mail
+from .process import init_process, run_in_process
+from .queue import claim, fail_abandoned, purge_done, run_task
+
+logger = logging.getLogger(__name__)
+
+# как часто удалять выполненные задачи, закрывать брошенные и ставить
+# отправку писем, оставшихся без задачи, в секундах
+HOUSEKEEPING_INTERVAL = 60 * 5
+
+
+class Worker:
+    """Исполнитель очереди: забирает задачи из БД и выполняет их
+    в пуле из processes процессов; при processes = 0 - в этом процессе.
+    burst - завершиться, когда готовых задач не останется."""
+
+    def __init__(self, processes, poll_interval, burst=False):
+        self.processes = processes
+        self.poll_interval = poll_interval
+        self.burst = burst
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = False
+        self.processed = 0
+        self.housekeeping_at = 0
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def housekeeping(self):
+        if time.monotonic() - self.housekeeping_at < HOUSEKEEPING_INTERVAL:
+            return
+        self.housekeeping_at = time.monotonic()
+        abandoned, purged = fail_abandoned(), purge_done()
+        if abandoned or purged:
+            logger.info(
+                'Брошенных задач закрыто: %s, выполненных удалено: %s',
+                abandoned, purged)
+        if schedule_stranded_mail():
+            logger.info('Поставлена отправка писем, оставшихся без задачи')
+
+    def run(self):
+        """Выполняет задачи до SIGTERM/SIGINT (или, при burst, пока они
+        есть). Возвращает число обработанных задач."""
+        previous = {
+            signum: signal.signal(signum, self.stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            if self.processes:
+                self.run_pool()
+            else:
+                self.run_inline()
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+        return self.processed
+
+    def run_inline(self):
+        while not self.stopping:
+            self.housekeeping()
+            claimed = claim(self.name, 1)
+            if not claimed:
+                if self.burst:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+            run_task(claimed[0])
+            self.processed += 1
+
+    def run_pool(self):
+        # spawn, а не fork: процессы пула не наследуют соединения с БД
+        pool = ProcessPoolExecutor(
+            self.processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_process,
+        )
+        running = set()
+        try:
+            while not self.stopping:
+                self.housekeeping()
+                free = self.processes - len(running)
+                claimed = claim(self.name, free) if free else []
+                running.update(
+                    pool.submit(run_in_process, pk) for pk in claimed)
+                if not running and self.burst:
+                    break
+                if claimed and len(running) < self.processes:
+                    continue
+                if running:
+                    done, running = wait(
+                        running, self.poll_interval,
+                        return_when=FIRST_COMPLETED)
+                    self.collect(done)
+                else:
+                    time.sleep(self.poll_interval)
+        finally:
+            # начатые задачи доделываются, новые не забираются
+            pool.shutdown(wait=True)
+            self.collect(running)
+
+    def collect(self, futures):
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                # процесс пула умер: задача вернётся по истечении аренды
+                logger.exception('Процесс пула завершился аварийно')
+            self.processed += 1
@@ -0,0 +1,14 @@
+import os
+
+from django.conf import settings
+
+from core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+application = get_asgi_application()
+
+if settings.TEMPLATES_WARMUP:
+    from core.template_warmup import warm_templates
+
+    warm_templates()
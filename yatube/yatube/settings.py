@@ -25,14 +25,20 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'sorl.thumbnail',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
     'users.apps.UsersConfig',
     'posts.apps.PostsConfig',
+    'tasks.apps.TasksConfig',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.QueryProfilerMiddleware',
+    'core.middleware.ReplicaMiddleware',
+    'core.middleware.TemplateProfilerMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -63,6 +69,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# ASGI: соединения держит цикл событий, Django работает в пуле потоков
+ASGI_APPLICATION = 'yatube.asgi.application'
+ASGI_THREADS = int(os.environ.get('YATUBE_ASGI_THREADS', 8))
+
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
@@ -74,6 +84,104 @@ DATABASES = {
     }
 }
 
+# PRAGMA для каждого нового соединения SQLite (core.db_pragmas);
+# настроенный набор - в yatube.settings_production
+SQLITE_PRAGMAS = {}
+
+# Реплики только для чтения: имена через запятую в YATUBE_DB_REPLICAS,
+# каждая - копия основной базы в отдельном файле SQLite.
+DATABASE_REPLICAS = tuple(
+    alias for alias in os.environ.get('YATUBE_DB_REPLICAS', '').split(',')
+    if alias
+)
+for alias in DATABASE_REPLICAS:
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, f'db_{alias}.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.db_routers.ReplicaRouter']
+
+# view, которые читают с реплик; запись всегда идёт в основную базу
+REPLICA_READ_VIEWS = (
+    'posts:home',
+    'posts:group',
+    'posts:profile',
+    'posts:post_detail',
+    'about:author',
+    'about:tech',
+)
+# сколько секунд после запроса на запись клиент читает с основной базы
+REPLICA_STICKY_SECONDS = 10
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Карточки постов: LocMemCache вытесняет давно не читанные записи (LRU)
+    'post_cards': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'post-cards',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    # Хранилище ключей sorl-thumbnail: размеры и имена готовых миниатюр.
+    # При нескольких процессах нужен общий кэш (memcached, redis)
+    'thumbnails': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'thumbnails',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+
+# Сжатие ответов (core.middleware.CompressionMiddleware): тела короче
+# COMPRESS_MIN_SIZE байт не сжимаются. brotli - с пакетом Brotli
+# из requirements.txt; без него клиентам отдаётся только gzip
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_GZIP_LEVEL = 6
+COMPRESS_BROTLI_QUALITY = 5
+# потоковые ответы сжимаются порциями не меньше этого размера
+COMPRESS_STREAM_BUFFER = 16 * 1024
+
+# Профилирование SQL: запросы дольше SLOW_QUERY_MS попадают в лог.
+# Число запросов и время в БД уходят в Server-Timing только при DEBUG,
+# SERVER_TIMING или для staff
+SLOW_QUERY_MS = 100
+SERVER_TIMING = bool(os.environ.get('YATUBE_SERVER_TIMING'))
+
+# Компилировать шаблоны при старте процесса; имеет смысл только
+# с кэширующим загрузчиком (yatube.settings_production)
+TEMPLATES_WARMUP = False
+
+# Профилирование шаблонов: время рендера по шаблонам и тегам,
+# отчёт на debug/templates/ (только для staff)
+TEMPLATE_PROFILING = bool(os.environ.get('YATUBE_TEMPLATE_PROFILING'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'yatube.queries': {
+            'handlers': ['console'],
+            'level': os.environ.get('YATUBE_QUERY_LOG_LEVEL', 'WARNING'),
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -114,10 +222,63 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# CSS, из которых collectstatic выбрасывает правила для классов,
+# не встречающихся в шаблонах; SAFELIST - классы, добавляемые не шаблонами
+STATIC_PURGE_CSS = ('css/bootstrap.min.css',)
+STATIC_PURGE_SAFELIST = ()
+
+# Отдавать STATIC_ROOT из WSGI-слоя core.static (yatube.settings_production)
+SERVE_STATIC = False
+
+MEDIA_URL = '/media/'
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Миниатюры картинок постов (posts.thumbnails): строятся пулом из
+# THUMBNAIL_WORKERS потоков после сохранения поста, 0 - сразу в запросе.
+# Хранилище ключей - БД с кэшем 'thumbnails' перед ней
+THUMBNAIL_KVSTORE = 'sorl.thumbnail.kvstores.cached_db_kvstore.KVStore'
+THUMBNAIL_CACHE = 'thumbnails'
+THUMBNAIL_PRESERVE_FORMAT = True
+THUMBNAIL_QUALITY = 85
+THUMBNAIL_WORKERS = int(os.environ.get('YATUBE_THUMBNAIL_WORKERS', 2))
+
+# Фоновые задачи (tasks): очередь в таблице БД, исполнитель -
+# manage.py run_worker. TASKS_EAGER - выполнять задачи сразу при
+# постановке, без очереди (разработка и тесты; в production - очередь)
+TASKS_EAGER = os.environ.get('YATUBE_TASKS_EAGER', '1') != '0'
+TASK_PROCESSES = int(os.environ.get('YATUBE_TASK_PROCESSES', 2))
+TASK_POLL_INTERVAL = 1
+TASK_MAX_ATTEMPTS = 5
+# пауза перед повтором: TASK_RETRY_DELAY * 2 ** (попытка - 1) секунд,
+# не больше TASK_RETRY_MAX_DELAY
+TASK_RETRY_DELAY = 10
+TASK_RETRY_MAX_DELAY = 60 * 60
+# задача, не завершённая за TASK_LEASE секунд, считается брошенной
+TASK_LEASE = 60 * 10
+TASK_KEEP_DONE = 60 * 60 * 24
+
+# Лента постов: постраничный вывод по курсору (pub_date, id) вместо ?page=
+POSTS_CURSOR_PAGINATION = False
+
+# Лента больше этого числа постов считается по статистике БД, а не COUNT(*)
+POSTS_COUNT_ESTIMATE_THRESHOLD = 100000
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:home'
 # LOGOUT_REDIRECT_URL = 'posts:home'
 
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма не отправляются в запросе: tasks.mail ставит их в очередь,
+# фоновая задача отправляет пачками по EMAIL_BATCH_SIZE через одно
+# соединение EMAIL_QUEUE_BACKEND. Локально это файлы в sent_emails/
+EMAIL_BACKEND = 'tasks.mail.QueuedEmailBackend'
+EMAIL_QUEUE_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+EMAIL_BATCH_SIZE = 50
+EMAIL_MAX_ATTEMPTS = 5
+# по скольким последним письмам считать задержку отправки
+EMAIL_METRICS_WINDOW = 500
@@ -0,0 +1,79 @@
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import (
+    BASE_DIR, CACHES, DATABASES, EMAIL_QUEUE_BACKEND, SECRET_KEY, TEMPLATES,
+)
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('YATUBE_SECRET_KEY', SECRET_KEY)
+
+ALLOWED_HOSTS = os.environ.get(
+    'YATUBE_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+# Шаблоны компилируются один раз на процесс. Загрузчики указаны явно,
+# поэтому кэш не зависит от DEBUG; APP_DIRS с ними несовместим.
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+# collectstatic: хэш в именах, чистка bootstrap, копии .gz/.br
+# (.br - с пакетом Brotli из requirements.txt, без него только .gz);
+# файлы отдаёт core.static с кэшированием на год
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+SERVE_STATIC = True
+
+# Кэш, общий для всех процессов хоста: поколения страниц лент, сами
+# страницы, числа постов, карточки и миниатюры. Сигналы сбрасывают их
+# в процессе, сохранившем пост, а команды manage.py (import_posts,
+# seed_posts) - в своём; с LocMemCache у каждого процесса свой кэш,
+# и остальные отдавали бы устаревшие страницы. Для нескольких хостов
+# нужен memcached или redis с теми же алиасами.
+CACHE_DIR = os.environ.get('YATUBE_CACHE_DIR', os.path.join(BASE_DIR, 'cache'))
+CACHES = {
+    alias: {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_DIR, alias),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+    for alias in CACHES
+}
+
+# Рассылка постов по лентам и прочие фоновые задачи идут через очередь:
+# нужен запущенный manage.py run_worker
+TASKS_EAGER = os.environ.get('YATUBE_TASKS_EAGER') == '1'
+
+# Бэкенд, которым очередь писем отправляет их на самом деле, например
+# django.core.mail.backends.smtp.EmailBackend (настройки EMAIL_HOST...)
+EMAIL_QUEUE_BACKEND = os.environ.get(
+    'YATUBE_EMAIL_BACKEND', EMAIL_QUEUE_BACKEND)
+
+# Рабочий процесс компилирует шаблоны проекта при старте (yatube/wsgi.py)
+TEMPLATES_WARMUP = True
+
+# Соединения с БД живут между запросами: PRAGMA выполняются один раз
+CONN_MAX_AGE = int(os.environ.get('YATUBE_CONN_MAX_AGE', 60))
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = CONN_MAX_AGE
+
+# WAL: чтения не ждут записи; synchronous=NORMAL в WAL не теряет
+# целостность при сбое процесса. mmap_size - в байтах, cache_size
+# со знаком минус - в КиБ, busy_timeout - в мс.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('YATUBE_SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('YATUBE_SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.environ.get('YATUBE_SQLITE_MMAP_SIZE', 256 * 2 ** 20)),
+    'cache_size': int(os.environ.get('YATUBE_SQLITE_CACHE_SIZE', -64000)),
+    'busy_timeout': int(os.environ.get('YATUBE_SQLITE_BUSY_TIMEOUT', 5000)),
+}
@@ -1,7 +1,15 @@
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
+from core.static import static_application
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
-application = get_wsgi_application()
+application = static_application(get_wsgi_application())
+
+if settings.TEMPLATES_WARMUP:
+    from core.template_warmup import warm_templates
+
+    warm_templates()